@@ -2,13 +2,21 @@
 Configuration settings for SEMP Requirements Debt Analyzer
 """
 import os
-from typing import Optional
+from functools import lru_cache
+from typing import Any, Optional
 from pydantic import Field
 from pydantic_settings import BaseSettings
 from dotenv import load_dotenv
 
+
+@lru_cache(maxsize=None)
+def _load_env_once() -> None:
+    """Load environment variables from .env file at most once per process"""
+    load_dotenv()
+
+
 # Load environment variables from .env file
-load_dotenv()
+_load_env_once()
 
 
 class Settings(BaseSettings):
@@ -22,36 +30,64 @@ class Settings(BaseSettings):
     # S3 Configuration
     s3_knowledge_base_bucket: str = Field(..., env="S3_KNOWLEDGE_BASE_BUCKET")
     s3_knowledge_base_prefix: str = Field(default="semp-docs/", env="S3_KNOWLEDGE_BASE_PREFIX")
+    s3_analysis_prefix: str = Field(default="analyses/", env="S3_ANALYSIS_PREFIX")
+    analysis_reuse_max_age: float = Field(default=604800.0, env="ANALYSIS_REUSE_MAX_AGE")
     
     # DynamoDB Configuration
     dynamodb_chat_history_table: str = Field(..., env="DYNAMODB_CHAT_HISTORY_TABLE")
     dynamodb_agent_info_table: str = Field(..., env="DYNAMODB_AGENT_INFO_TABLE")
+    dynamodb_cache_ttl: float = Field(default=3.0, env="DYNAMODB_CACHE_TTL")
     
     # AWS Bedrock Configuration
     bedrock_model_id: str = Field(default="anthropic.claude-3-sonnet-20240229-v1:0", env="BEDROCK_MODEL_ID")
     bedrock_embedding_model_id: str = Field(default="amazon.titan-embed-text-v1", env="BEDROCK_EMBEDDING_MODEL_ID")
     bedrock_region: str = Field(default="us-east-1", env="BEDROCK_REGION")
+    bedrock_max_concurrency: int = Field(default=4, env="BEDROCK_MAX_CONCURRENCY")
+    bedrock_max_attempts: int = Field(default=6, env="BEDROCK_MAX_ATTEMPTS")
+    bedrock_sections_per_call: int = Field(default=3, env="BEDROCK_SECTIONS_PER_CALL")
+    bedrock_prompt_caching: bool = Field(default=False, env="BEDROCK_PROMPT_CACHING")
+    bedrock_batch_role_arn: Optional[str] = Field(default=None, env="BEDROCK_BATCH_ROLE_ARN")
+    bedrock_batch_s3_prefix: str = Field(default="batch-inference/", env="BEDROCK_BATCH_S3_PREFIX")
+    bedrock_batch_timeout: float = Field(default=7200.0, env="BEDROCK_BATCH_TIMEOUT")
     
     # Application Configuration
     app_name: str = Field(default="SEMP Requirements Debt Analyzer", env="APP_NAME")
     log_level: str = Field(default="INFO", env="LOG_LEVEL")
     max_chat_history: int = Field(default=50, env="MAX_CHAT_HISTORY")
+    max_document_chars: int = Field(default=2_000_000, env="MAX_DOCUMENT_CHARS")
     chunk_size: int = Field(default=1000, env="CHUNK_SIZE")
     chunk_overlap: int = Field(default=200, env="CHUNK_OVERLAP")
     environment: str = Field(default="dev", env="ENVIRONMENT")
     
+    # Settings are read-only once loaded; freezing skips assignment validation
     model_config = {
         "env_file": ".env",
         "case_sensitive": False,
+        "frozen": True,
+        "validate_assignment": False,
     }
 
 
-# Global settings instance
-settings = Settings()
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """Get the cached application settings, constructing them on first use"""
+    return Settings()
+
+
+class _LazySettings:
+    """Proxy that defers Settings construction until an attribute is accessed"""
+    
+    def __getattr__(self, name: str) -> Any:
+        return getattr(get_settings(), name)
+
+
+# Global settings instance (resolved lazily via get_settings())
+settings = _LazySettings()
 
 
 def get_aws_config() -> dict:
     """Get AWS configuration dictionary"""
+    settings = get_settings()
     return {
         "aws_access_key_id": settings.aws_access_key_id,
         "aws_secret_access_key": settings.aws_secret_access_key,
@@ -59,8 +95,17 @@ def get_aws_config() -> dict:
     }
 
 
+@lru_cache(maxsize=1)
+def get_aws_session():
+    """Get the process-wide boto3 session shared by all AWS clients"""
+    import boto3
+    
+    return boto3.session.Session(**get_aws_config())
+
+
 def get_bedrock_config() -> dict:
     """Get AWS Bedrock configuration dictionary"""
+    settings = get_settings()
     return {
         "model_id": settings.bedrock_model_id,
         "embedding_model_id": settings.bedrock_embedding_model_id,
@@ -2,34 +2,81 @@
 """
 SEMP Requirements Debt Analyzer - Main Application
 """
+import os
 import sys
 import json
+import mmap
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
+from typing import Callable, Optional
 import click
 from rich.console import Console
 from rich.table import Table
 from rich.panel import Panel
 from rich.progress import Progress
+from rich.text import Text
 from loguru import logger
 
-# Add src to path for imports
-sys.path.append(str(Path(__file__).parent / "src"))
+try:
+    import orjson
+except ImportError:  # Fall back to the stdlib encoder when orjson is unavailable
+    orjson = None
 
-from config.settings import settings
-from src.agent.session_manager import SEMPChatSessionManager
-from src.rag.knowledge_base import SEMPKnowledgeBase
-from src.agent.debt_analyzer import RequirementsDebtAnalyzer
-from src.models.debt_models import AnalysisRequest, SeverityLevel
+from config.settings import get_settings
 
 console = Console()
 
+# Click choice types built once at import rather than per decorator evaluation
+OUTPUT_FORMAT_CHOICE = click.Choice(['table', 'json', 'summary'])
+SEVERITY_CHOICE = click.Choice(['Low', 'Medium', 'High', 'Critical'])
+
+# Rich styles for each severity level in the results table
+SEVERITY_STYLES = {
+    "Low": "dim",
+    "Medium": "yellow",
+    "High": "red",
+    "Critical": "bold red"
+}
+
+# Summary panel shown above the results table
+TABLE_SUMMARY_TEMPLATE = """Total Issues: {total_issues}
+Analysis Duration: {analysis_duration:.2f}s
+High/Critical Issues: {high_severity_issues}
+Average Confidence: {average_confidence:.2f}"""
+
+# Escapes pipes and flattens line breaks for markdown table cells in one pass
+MARKDOWN_CELL_TRANSLATION = str.maketrans({'|': '\\|', '\n': ' ', '\r': ' '})
+
+# Log formats: colour markup only pays off on an interactive terminal
+TTY_LOG_FORMAT = "<green>{time:YYYY-MM-DD HH:mm:ss}</green> | <level>{level: <8}</level> | <cyan>{name}</cyan>:<cyan>{function}</cyan>:<cyan>{line}</cyan> - <level>{message}</level>"
+PLAIN_LOG_FORMAT = "{time:HH:mm:ss} | {level} | {name}:{line} - {message}"
+
 # Configure logging
 logger.remove()
-logger.add(
-    sys.stderr, 
-    level=settings.log_level,
-    format="<green>{time:YYYY-MM-DD HH:mm:ss}</green> | <level>{level: <8}</level> | <cyan>{name}</cyan>:<cyan>{function}</cyan>:<cyan>{line}</cyan> - <level>{message}</level>"
-)
+if sys.stderr.isatty():
+    logger.add(sys.stderr, level=get_settings().log_level, format=TTY_LOG_FORMAT)
+else:
+    logger.add(sys.stderr, level=get_settings().log_level, format=PLAIN_LOG_FORMAT, colorize=False)
+
+
+@lru_cache(maxsize=None)
+def _severity_level(value: str):
+    """Resolve a severity string to its SeverityLevel member (memoized)"""
+    from src.models.debt_models import SeverityLevel
+    return SeverityLevel(value)
+
+
+def _run_with_progress(description: str, work: Callable[[Optional[Callable[[float], None]]], object]):
+    """Run work(progress_cb), showing a progress bar only on an interactive terminal."""
+    if not console.is_terminal:
+        return work(None)
+    
+    with Progress(console=console) as progress:
+        task = progress.add_task(description, total=100)
+        outcome = work(lambda percent: progress.update(task, completed=percent))
+        progress.update(task, completed=100)
+    return outcome
 
 
 @click.group()
@@ -43,16 +90,17 @@ def cli():
 @click.option('--force-refresh', is_flag=True, help='Force reprocessing of all documents')
 def init_knowledge_base(force_refresh):
     """Initialize or refresh the knowledge base from S3 documents."""
+    from src.rag.knowledge_base import SEMPKnowledgeBase
+    
     console.print(Panel("Initializing Knowledge Base", style="blue"))
     
     try:
-        kb = SEMPKnowledgeBase()
+        kb = SEMPKnowledgeBase.instance()
         
-        with Progress() as progress:
-            task = progress.add_task("Processing documents...", total=100)
-            
-            success = kb.initialize_knowledge_base(force_refresh=force_refresh)
-            progress.update(task, completed=100)
+        success = _run_with_progress(
+            "Processing documents...",
+            lambda progress_cb: kb.initialize_knowledge_base(force_refresh=force_refresh, progress_cb=progress_cb)
+        )
         
         if success:
             console.print("✅ Knowledge base initialized successfully!", style="green")
@@ -65,60 +113,81 @@ def init_knowledge_base(force_refresh):
 
 
 @cli.command()
-@click.argument('document_file', type=click.Path(exists=True, path_type=Path))
+@click.argument('document_file', type=click.Path(exists=True, resolve_path=True, readable=True, path_type=Path))
 @click.option('--output', '-o', type=click.Path(path_type=Path), help='Output file for results')
-@click.option('--format', 'output_format', type=click.Choice(['table', 'json', 'summary']), default='table', help='Output format')
-@click.option('--severity', type=click.Choice(['Low', 'Medium', 'High', 'Critical']), default='Low', help='Minimum severity threshold')
+@click.option('--format', 'output_format', type=OUTPUT_FORMAT_CHOICE, default='table', help='Output format')
+@click.option('--severity', type=SEVERITY_CHOICE, default='Low', help='Minimum severity threshold')
 @click.option('--no-suggestions', is_flag=True, help='Exclude improvement suggestions')
-def analyze(document_file, output, output_format, severity, no_suggestions):
+@click.option('--batch-inference', is_flag=True, help='Submit sections as a Bedrock batch inference job (slower, lower cost)')
+def analyze(document_file, output, output_format, severity, no_suggestions, batch_inference):
     """Analyze a SEMP document for requirements debt."""
+    from src.rag.knowledge_base import SEMPKnowledgeBase
+    from src.rag.document_processor import DocumentProcessor
+    from src.agent.debt_analyzer import RequirementsDebtAnalyzer
+    from src.models.debt_models import AnalysisRequest
+    
     console.print(Panel(f"Analyzing Document: {document_file.name}", style="blue"))
     
     try:
-        # Read document content (in binary mode for proper handling of PDFs and other file types)
-        with open(document_file, 'rb') as f:
-            binary_content = f.read()
-        
         # Initialize components
-        kb = SEMPKnowledgeBase()
+        kb = SEMPKnowledgeBase.instance()
         
         # Extract text from the document using the document processor
-        from src.rag.document_processor import DocumentProcessor
         processor = DocumentProcessor()
         
         # Initialize analyzer with document processor
         analyzer = RequirementsDebtAnalyzer(kb, processor)
-        text_content = processor.extract_text(binary_content, document_file.name)
+        
+        # Map the document read-only (binary mode for PDFs and other file types) so
+        # the parser pages bytes in on demand instead of holding a full copy
+        with document_file.open('rb', buffering=0) as f:
+            # fstat the open descriptor rather than stat()ing the path again
+            if os.fstat(f.fileno()).st_size:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as binary_content:
+                    text_content = processor.extract_text(binary_content, document_file.name)
+            else:
+                text_content = None
         
         if not text_content:
             console.print(f"❌ Failed to extract text from {document_file.name}", style="red")
             return
+        if len(text_content) > get_settings().max_document_chars:
+            console.print(
+                f"❌ {document_file.name} is too large to analyze "
+                f"({len(text_content)} characters, limit {get_settings().max_document_chars})",
+                style="red"
+            )
+            return
         
         # Create analysis request
         request = AnalysisRequest(
             document_content=text_content,
             document_name=document_file.name,
-            severity_threshold=SeverityLevel(severity),
-            include_suggestions=not no_suggestions
+            severity_threshold=_severity_level(severity),
+            include_suggestions=not no_suggestions,
+            use_batch_inference=batch_inference
         )
         
         # Perform analysis
-        with Progress() as progress:
-            task = progress.add_task("Analyzing document...", total=100)
-            result = analyzer.analyze_document(request)
-            progress.update(task, completed=100)
+        result = _run_with_progress(
+            "Analyzing document...",
+            lambda progress_cb: analyzer.analyze_document(request, progress_cb=progress_cb)
+        )
+        
+        # Serialize once for JSON output so display and save share the same payload
+        payload = _json_payload(result) if output_format == 'json' else None
         
         # Display results
         if output_format == 'table':
             display_results_table(result)
         elif output_format == 'json':
-            display_results_json(result)
+            display_results_json(result, payload=payload)
         else:
             display_results_summary(result)
         
         # Save output if specified
         if output:
-            save_results(result, output, output_format)
+            save_results(result, output, output_format, payload=payload)
             console.print(f"✅ Results saved to {output}", style="green")
         
     except Exception as e:
@@ -130,6 +199,8 @@ def analyze(document_file, output, output_format, severity, no_suggestions):
 @click.option('--user-id', default='default', help='User ID for the session')
 def chat(user_id):
     """Start an interactive chat session for SEMP analysis."""
+    from src.agent.session_manager import SEMPChatSessionManager
+    
     console.print(Panel("SEMP Requirements Debt Analyzer - Chat Mode", style="blue"))
     console.print("Type 'quit' or 'exit' to end the session\n")
     
@@ -182,10 +253,12 @@ def chat(user_id):
 @click.option('--threshold', default=0.6, help='Minimum relevance score')
 def search(query, top_k, threshold):
     """Search the knowledge base for relevant information."""
+    from src.rag.knowledge_base import SEMPKnowledgeBase
+    
     console.print(Panel(f"Searching Knowledge Base: '{query}'", style="blue"))
     
     try:
-        kb = SEMPKnowledgeBase()
+        kb = SEMPKnowledgeBase.instance()
         results = kb.search_knowledge_base(query, top_k=top_k, score_threshold=threshold)
         
         if not results:
@@ -219,6 +292,7 @@ def search(query, top_k, threshold):
 def status():
     """Show system status and configuration."""
     console.print(Panel("System Status", style="blue"))
+    settings = get_settings()
     
     # Configuration info
     config_table = Table(title="Configuration")
@@ -241,57 +315,84 @@ def status():
         from src.infrastructure.s3_client import S3KnowledgeBaseClient
         from src.infrastructure.dynamodb_client import DynamoDBChatClient
         from src.infrastructure.bedrock_client import BedrockClient
+        from src.rag.knowledge_base import SEMPKnowledgeBase
         
-        # Test S3
-        try:
-            s3_client = S3KnowledgeBaseClient()
-            docs = s3_client.list_documents()
-            console.print(f"✅ S3 Connection: {len(docs)} documents found", style="green")
-        except Exception as e:
-            console.print(f"❌ S3 Connection: {e}", style="red")
+        def probe_s3():
+            docs = S3KnowledgeBaseClient.instance().list_documents()
+            return True, f"{len(docs)} documents found"
         
-        # Test DynamoDB
-        try:
-            db_client = DynamoDBChatClient()
+        def probe_dynamodb():
             # Try to get info for a non-existent session (should not error)
-            db_client.get_session_info("test-session")
-            console.print("✅ DynamoDB Connection: OK", style="green")
-        except Exception as e:
-            console.print(f"❌ DynamoDB Connection: {e}", style="red")
+            DynamoDBChatClient.instance().get_session_info("test-session")
+            return True, "OK"
         
-        # Test Bedrock
-        try:
-            bedrock_client = BedrockClient()
-            if bedrock_client.test_connection():
-                console.print("✅ Bedrock Connection: OK", style="green")
-            else:
-                console.print("❌ Bedrock Connection: Failed", style="red")
-        except Exception as e:
-            console.print(f"❌ Bedrock Connection: {e}", style="red")
+        def probe_bedrock():
+            if BedrockClient.instance().test_connection():
+                return True, "OK"
+            return False, "Failed"
         
-        # Test Knowledge Base
-        try:
-            kb = SEMPKnowledgeBase()
-            all_chunks = kb.get_all_chunks()
-            console.print(f"✅ Knowledge Base: {len(all_chunks)} chunks loaded", style="green")
-        except Exception as e:
-            console.print(f"❌ Knowledge Base: {e}", style="red")
+        def probe_knowledge_base():
+            all_chunks = SEMPKnowledgeBase.instance().get_all_chunks()
+            return True, f"{len(all_chunks)} chunks loaded"
+        
+        probes = [
+            ("S3 Connection", probe_s3),
+            ("DynamoDB Connection", probe_dynamodb),
+            ("Bedrock Connection", probe_bedrock),
+            ("Knowledge Base", probe_knowledge_base),
+        ]
+        
+        # boto3 sessions are not thread-safe, so create the clients before fanning out
+        for client_factory in (S3KnowledgeBaseClient.instance, DynamoDBChatClient.instance, BedrockClient.instance):
+            try:
+                client_factory()
+            except Exception:
+                pass  # Reported by the matching probe below
+        
+        # The probes are independent network round trips, so run them concurrently
+        with ThreadPoolExecutor(max_workers=len(probes)) as executor:
+            futures = [(label, executor.submit(probe)) for label, probe in probes]
+            
+            for label, future in futures:
+                try:
+                    ok, detail = future.result()
+                except Exception as e:
+                    ok, detail = False, e
+                
+                if ok:
+                    console.print(f"✅ {label}: {detail}", style="green")
+                else:
+                    console.print(f"❌ {label}: {detail}", style="red")
             
     except Exception as e:
         console.print(f"❌ Status check failed: {e}", style="red")
 
 
+def _rank_issues(issues):
+    """Order issues by severity (most severe first), then by descending confidence."""
+    from src.agent.debt_analyzer import SEVERITY_RANK
+    
+    return sorted(
+        issues,
+        key=lambda issue: (-SEVERITY_RANK.get(issue.severity, 0), -issue.confidence)
+    )
+
+
 def display_results_table(result):
     """Display analysis results in table format."""
-    if not result.issues:
+    issues = result.issues
+    issue_count = len(issues)
+    if not issue_count:
         console.print("No issues found in the analysis.", style="yellow")
         return
     
     # Summary panel
-    summary_text = f"""Total Issues: {result.total_issues}
-Analysis Duration: {result.analysis_duration:.2f}s
-High/Critical Issues: {result.summary.get('high_severity_issues', 0)}
-Average Confidence: {result.summary.get('average_confidence', 0.0):.2f}"""
+    summary_text = TABLE_SUMMARY_TEMPLATE.format(
+        total_issues=result.total_issues,
+        analysis_duration=result.analysis_duration,
+        high_severity_issues=result.summary.get('high_severity_issues', 0),
+        average_confidence=result.summary.get('average_confidence', 0.0)
+    )
     
     console.print(Panel(summary_text, title="Analysis Summary", style="blue"))
     
@@ -303,31 +404,45 @@ Average Confidence: {result.summary.get('average_confidence', 0.0):.2f}"""
     table.add_column("Reference", style="yellow", no_wrap=False, max_width=30)
     table.add_column("Severity", style="bold", width=10)
     
-    for issue in result.issues[:20]:  # Limit to first 20
-        # Show full content, let Rich handle text wrapping
-        location = issue.location_in_text
-        problem = f"{issue.debt_type.value}: {issue.problem_description}"
-        fix = issue.recommended_fix
-        reference = issue.reference
-        
-        severity_style = {
-            "Low": "dim",
-            "Medium": "yellow",
-            "High": "red",
-            "Critical": "bold red"
-        }.get(issue.severity.value, "white")
-        
-        table.add_row(location, problem, fix, reference, f"[{severity_style}]{issue.severity.value}[/{severity_style}]")
+    # Build all rows up front; plain Text cells skip Rich's markup parser
+    shown_issues = _rank_issues(issues)[:20]  # Limit to the 20 most important
+    rows = [
+        (
+            Text(issue.location_in_text),
+            Text(f"{issue.debt_type.value}: {issue.problem_description}"),
+            Text(issue.recommended_fix),
+            Text(issue.reference),
+            Text(issue.severity.value, style=SEVERITY_STYLES.get(issue.severity.value, "white"))
+        )
+        for issue in shown_issues
+    ]
+    
+    for row in rows:
+        table.add_row(*row)
     
     console.print(table)
     
-    if len(result.issues) > 20:
-        console.print(f"\n[dim]Showing first 20 of {len(result.issues)} total issues[/dim]")
+    if issue_count > 20:
+        console.print(f"\n[dim]Showing first 20 of {issue_count} total issues[/dim]")
+
+
+def _dump_json(data) -> bytes:
+    """Serialize data as indented UTF-8 JSON, using orjson when installed."""
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2, default=str)
+    return json.dumps(data, indent=2, default=str).encode('utf-8')
 
 
-def display_results_json(result):
+def _json_payload(result) -> dict:
+    """Dump analysis results to JSON-compatible primitives."""
+    return result.model_dump(mode="json")
+
+
+def display_results_json(result, payload=None):
     """Display analysis results in JSON format."""
-    console.print(json.dumps(result.dict(), indent=2, default=str))
+    if payload is None:
+        payload = _json_payload(result)
+    console.print(_dump_json(payload).decode('utf-8'))
 
 
 def display_results_summary(result):
@@ -343,42 +458,49 @@ Analysis Complete: {result.document_name}
 
 📈 Issue Distribution by Severity:"""
     
-    for severity, count in result.severity_distribution.items():
-        if count > 0:
-            summary_text += f"\n  • {severity}: {count} issues"
-    
-    summary_text += f"\n\n🎯 Most Common Debt Type: {result.summary.get('most_common_debt_type', 'N/A')}"
-    summary_text += f"\n💡 Recommendations Provided: {result.summary.get('recommendations_provided', 0)}"
+    parts = [summary_text]
+    parts.extend(
+        f"\n  • {severity}: {count} issues"
+        for severity, count in result.severity_distribution.items()
+        if count > 0
+    )
+    parts.append(f"\n\n🎯 Most Common Debt Type: {result.summary.get('most_common_debt_type', 'N/A')}")
+    parts.append(f"\n💡 Recommendations Provided: {result.summary.get('recommendations_provided', 0)}")
     
-    console.print(Panel(summary_text, title="Analysis Summary", style="blue"))
+    console.print(Panel("".join(parts), title="Analysis Summary", style="blue"))
 
 
-def save_results(result, output_path, format_type):
+def save_results(result, output_path, format_type, payload=None):
     """Save analysis results to file."""
     if format_type == 'json':
-        with open(output_path, 'w') as f:
-            json.dump(result.dict(), f, indent=2, default=str)
+        if payload is None:
+            payload = _json_payload(result)
+        with open(output_path, 'wb') as f:
+            f.write(_dump_json(payload))
     else:
-        # Save as text/markdown
-        with open(output_path, 'w') as f:
-            f.write(f"# SEMP Requirements Debt Analysis Results\n\n")
-            f.write(f"**Document:** {result.document_name}\n")
-            f.write(f"**Analysis Date:** {result.analysis_timestamp}\n")
-            f.write(f"**Total Issues:** {result.total_issues}\n")
-            f.write(f"**Analysis Duration:** {result.analysis_duration:.2f} seconds\n\n")
-            
-            f.write("## Issues Found\n\n")
-            f.write("| Location | Debt Type / Problem | Recommended Fix | Reference | Severity |\n")
-            f.write("|----------|-------------------|-----------------|-----------|----------|\n")
+        # Save as text/markdown, assembled in memory and written in one call
+        parts = [
+            "# SEMP Requirements Debt Analysis Results\n\n",
+            f"**Document:** {result.document_name}\n",
+            f"**Analysis Date:** {result.analysis_timestamp}\n",
+            f"**Total Issues:** {result.total_issues}\n",
+            f"**Analysis Duration:** {result.analysis_duration:.2f} seconds\n\n",
+            "## Issues Found\n\n",
+            "| Location | Debt Type / Problem | Recommended Fix | Reference | Severity |\n",
+            "|----------|-------------------|-----------------|-----------|----------|\n",
+        ]
+        
+        row_template = "| {} | {} | {} | {} | {} |\n"
+        for issue in _rank_issues(result.issues):
+            # Escape pipe characters but don't truncate content
+            location = issue.location_in_text.translate(MARKDOWN_CELL_TRANSLATION)
+            problem = f"{issue.debt_type.value}: {issue.problem_description}".translate(MARKDOWN_CELL_TRANSLATION)
+            fix = issue.recommended_fix.translate(MARKDOWN_CELL_TRANSLATION)
+            reference = issue.reference.translate(MARKDOWN_CELL_TRANSLATION)
             
-            for issue in result.issues:
-                # Escape pipe characters but don't truncate content
-                location = issue.location_in_text.replace('|', '\\|').replace('\n', ' ')
-                problem = f"{issue.debt_type.value}: {issue.problem_description}".replace('|', '\\|').replace('\n', ' ')
-                fix = issue.recommended_fix.replace('|', '\\|').replace('\n', ' ')
-                reference = issue.reference.replace('|', '\\|').replace('\n', ' ')
-                
-                f.write(f"| {location} | {problem} | {fix} | {reference} | {issue.severity.value} |\n")
+            parts.append(row_template.format(location, problem, fix, reference, issue.severity.value))
+        
+        Path(output_path).write_text("".join(parts))
 
 
 if __name__ == '__main__':
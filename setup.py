@@ -13,11 +13,13 @@ long_description = readme_path.read_text() if readme_path.exists() else ""
 requirements_path = Path(__file__).parent / "requirements.txt"
 requirements = []
 if requirements_path.exists():
-    requirements = [
-        line.strip() 
-        for line in requirements_path.read_text().splitlines() 
-        if line.strip() and not line.startswith("#")
-    ]
+    with requirements_path.open() as f:
+        # Strip each line once, dropping comments (including inline ones) and blanks
+        requirements = [
+            requirement
+            for requirement in (line.split("#", 1)[0].strip() for line in f)
+            if requirement
+        ]
 
 setup(
     name="semp-rq-debt-analyzer",
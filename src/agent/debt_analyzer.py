@@ -1,12 +1,22 @@
 """
 Core Requirements Debt Detection Agent with chain-of-thought reasoning
 """
-import uuid
+import heapq
+import re
 import time
 import json
-from typing import List, Dict, Optional, Any
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from operator import itemgetter
+from typing import Callable, List, Dict, Optional, Any, Tuple
+from uuid import uuid4
 from loguru import logger
 
+try:
+    import orjson
+except ImportError:  # Fall back to the stdlib decoder when orjson is unavailable
+    orjson = None
+
 from config.settings import get_bedrock_config, settings
 from src.infrastructure.bedrock_client import BedrockClient
 from src.models.debt_models import (
@@ -16,6 +26,135 @@ from src.models.debt_models import (
 )
 from src.rag.knowledge_base import SEMPKnowledgeBase
 from src.rag.document_processor import DocumentProcessor
+from src.rag.semantic_cache import SemanticAnalysisCache
+
+# Control characters stripped from LLM responses before JSON parsing (C0 and C1 ranges)
+CONTROL_CHAR_TABLE = dict.fromkeys([*range(0x00, 0x20), *range(0x7f, 0xa0)])
+
+# Reusable decoder for extracting the JSON object from LLM responses
+JSON_DECODER = json.JSONDecoder()
+
+# Assistant prefill that makes the model answer with the JSON object directly
+JSON_PREFILL = "{"
+
+# Top-level keys of single and multi-section analysis responses
+ANALYSIS_RESPONSE_KEYS = ('issues', 'reasoning_steps', 'analyses')
+
+# Numbered section header lines (e.g. "3. Scope", "4.2.1 Interfaces") used to split documents
+SECTION_HEADER_PATTERN = re.compile(r'^[ \t]*(\d+(?:\.\d+)*\.?)[ \t]+([^\n]+)', re.MULTILINE)
+
+# Ordering of severity levels for threshold comparisons
+SEVERITY_RANK = {
+    SeverityLevel.LOW: 1,
+    SeverityLevel.MEDIUM: 2,
+    SeverityLevel.HIGH: 3,
+    SeverityLevel.CRITICAL: 4
+}
+
+# Number of most relevant knowledge base chunks used as context per section
+MAX_CONTEXT_CHUNKS = 5
+
+# Sort key for knowledge base search hits
+SCORE_KEY = itemgetter('score')
+
+# Maximum characters of section content sent to the model
+MAX_SECTION_CHARS = 3000
+
+# Outcome of each section's analysis, reported as counts in the result summary: analyzed,
+# skipped for lack of knowledge base grounding, or failed (model error or unparseable output)
+SECTION_ANALYZED = "analyzed"
+SECTION_UNGROUNDED = "ungrounded"
+SECTION_FAILED = "failed"
+
+# Bedrock batch inference rejects jobs with fewer records than this
+BATCH_INFERENCE_MIN_RECORDS = 100
+
+# Maximum length of quotes shown in issue locations
+QUOTE_MAX = 80
+
+# Distribution keys in report order
+SEVERITY_VALUES = tuple(level.value for level in SeverityLevel)
+DEBT_TYPE_VALUES = tuple(debt_type.value for debt_type in DebtType)
+
+# Debt types keyed by lowercase value for exact lookups of AI model output
+DEBT_TYPE_BY_VALUE = {debt_type.value.lower(): debt_type for debt_type in DebtType}
+
+# Common variations of debt type names returned by the AI model
+DEBT_TYPE_MAPPINGS = {
+    'traceability gaps': DebtType.TRACEABILITY_GAP,
+    'traceability gap': DebtType.TRACEABILITY_GAP,
+    'missing traceability': DebtType.TRACEABILITY_GAP,
+    'vague terms': DebtType.VAGUE_TERMINOLOGY,
+    'unclear terms': DebtType.VAGUE_TERMINOLOGY,
+    'missing acceptance criteria': DebtType.UNCLEAR_ACCEPTANCE_CRITERIA,
+    'conflicting': DebtType.CONFLICTING_REQUIREMENTS,
+    'outdated': DebtType.OUTDATED_REQUIREMENTS,
+    'untestable': DebtType.UNTESTABLE_REQUIREMENTS,
+    'incomplete': DebtType.INCOMPLETENESS,
+    'inconsistent': DebtType.INCONSISTENCY,
+    'ambiguous': DebtType.AMBIGUITY,
+    'debt management': DebtType.MISSING_CONSTRAINTS,  # Fallback for debt management issues
+}
+
+# Authoritative sources that can be cited (survey responses are excluded)
+AUTHORITATIVE_SOURCES = {
+    'incose_sehb5.pdf': 'INCOSE Systems Engineering Handbook',
+    'nasa_systems_engineering_handbook_0.pdf': 'NASA Systems Engineering Handbook',
+    'requirements_debt_detection_guide.txt': 'Requirements Debt Detection Guide',
+    'fundamentals_se_rq.pdf': 'Fundamentals of SE Requirements',
+    'seli-guide-rev2.pdf': 'Systems Engineering Leadership Guide',
+    'systems engineering - 2023 - kleinwaks': 'Technical Debt in Systems Engineering (Kleinwaks 2023)'
+}
+
+# System prompt shared by every section analysis
+SYSTEM_PROMPT = """You are an expert assistant specializing in Requirements Engineering, Systems Engineering, and the detection of Requirements Debt (RQ Debt). Your primary task is to evaluate Systems Engineering Management Plans (SEMPs) for potential instances of RQ Debt.
+
+When analyzing a SEMP section, you must:
+1. Apply Chain-of-Thought reasoning to explain your findings
+2. Identify specific debt types: ambiguity, incompleteness, inconsistency, traceability gaps, vague terminology, missing constraints, unclear acceptance criteria, conflicting requirements, outdated requirements, untestable requirements
+3. Provide practical improvements aligned with Systems Engineering standards
+4. Use the provided knowledge base references to support your evaluation
+5. Assess severity (Low, Medium, High, Critical) and confidence (0.0-1.0)
+
+Your analysis should be thorough yet precise, highlighting uncertainty where human review is necessary.
+
+Respond in JSON format with this structure:
+{
+  "reasoning_steps": [
+    {
+      "step": 1,
+      "description": "Step description",
+      "evidence": ["evidence1", "evidence2"],
+      "conclusion": "Step conclusion"
+    }
+  ],
+  "issues": [
+    {
+      "location": "specific text phrase or exact quote from the document",
+      "type": "debt type",
+      "problem": "detailed problem description",
+      "fix": "recommended solution",
+      "severity": "Low|Medium|High|Critical",
+      "confidence": 0.8,
+      "context": "actual text snippet showing the issue (quote 2-3 sentences)"
+    }
+  ],
+  "overall_assessment": "Summary of findings"
+}"""
+
+
+# Analysis instructions shared by single and multi-section prompts
+ANALYSIS_INSTRUCTIONS = """Apply chain-of-thought reasoning to identify potential requirements debt issues. For each issue found, provide:
+1. The exact location: Quote the specific text phrase or sentence where the issue occurs
+2. The specific debt type and problem description
+3. A recommended fix aligned with systems engineering best practices
+4. Severity and confidence assessment
+5. Context: Include 2-3 sentences from the document showing the problematic text
+
+IMPORTANT: In the 'location' field, include actual quoted text from the document, not just section names.
+In the 'context' field, provide the surrounding sentences that demonstrate the issue.
+
+Focus on actionable findings that would help improve the SEMP's quality and reduce requirements debt."""
 
 
 class RequirementsDebtAnalyzer:
@@ -25,56 +164,73 @@ class RequirementsDebtAnalyzer:
         self.knowledge_base = knowledge_base
         self.document_processor = document_processor or DocumentProcessor()
         
-        # Initialize Bedrock client
-        self.bedrock_client = BedrockClient()
+        # Use the shared Bedrock client so connections are pooled across analyzers
+        self.bedrock_client = BedrockClient.instance()
         
-        # Store original document text for coordinate lookups
-        self.original_text = None
+        # Semantic cache of prior section analyses, sized to the embedding model's output and
+        # shared by every analyzer in the process
+        self.analysis_cache = SemanticAnalysisCache.instance(
+            str(knowledge_base.cache_dir / "analysis_cache.faiss"), self.bedrock_client.model_id
+        )
         
         logger.info("Requirements Debt Analyzer initialized")
     
-    def analyze_document(self, request: AnalysisRequest) -> AnalysisResult:
-        """Analyze a SEMP document for requirements debt"""
+    def analyze_document(
+        self, request: AnalysisRequest, progress_cb: Optional[Callable[[float], None]] = None
+    ) -> AnalysisResult:
+        """Analyze a SEMP document for requirements debt
+        
+        progress_cb, if given, is called with the percentage (0-100) of sections analyzed.
+        """
         start_time = time.time()
         
         logger.info(f"Starting analysis of document: {request.document_name}")
         
         try:
-            # Store original document text for coordinate lookups
-            self.original_text = request.document_content
-            
             # Initialize result
             result = AnalysisResult(
                 document_name=request.document_name,
-                document_id=str(uuid.uuid4())
+                document_id=str(uuid4())
             )
             
             # Split document into analyzable sections
             sections = self._split_document_into_sections(request.document_content)
-            
-            # Analyze each section for debt issues
-            all_issues = []
-            for section_name, section_content in sections.items():
-                section_issues = self._analyze_section(
-                    section_content, section_name, request
-                )
-                all_issues.extend(section_issues)
-            
-            # Filter by severity threshold
-            filtered_issues = [
-                issue for issue in all_issues
-                if self._severity_meets_threshold(issue.severity, request.severity_threshold)
-            ]
+            section_items = list(sections.items())
+            
+            # Bulk analyses can go through Bedrock batch inference; fall back to
+            # interactive calls when that isn't configured or applicable
+            section_results = None
+            if request.use_batch_inference:
+                section_results = self._analyze_sections_with_batch_inference(section_items, request)
+            if section_results is None:
+                section_results = self._analyze_sections_concurrently(section_items, request, progress_cb)
+            
+            # Persist the section analyses cached by this document in one write
+            self.analysis_cache.flush()
+            
+            # Keep issues in document order regardless of completion order
+            all_issues = [issue for _, section_issues in section_results for issue in section_issues]
+            section_outcomes = Counter(outcome for outcome, _ in section_results)
+            
+            # Filter by severity threshold, counting distributions in the same pass
+            filtered_issues, result.severity_distribution, result.debt_type_distribution = (
+                self._filter_issues_with_distributions(all_issues, request.severity_threshold)
+            )
             
             # Update result with findings
             result.issues = filtered_issues
             result.total_issues = len(filtered_issues)
-            result.severity_distribution = self._calculate_severity_distribution(filtered_issues)
-            result.debt_type_distribution = self._calculate_debt_type_distribution(filtered_issues)
             result.analysis_duration = time.time() - start_time
             
-            # Generate summary
+            # Generate summary, recording sections whose findings are missing from the result
             result.summary = self._generate_analysis_summary(result)
+            result.summary["failed_sections"] = section_outcomes[SECTION_FAILED]
+            result.summary["ungrounded_sections"] = section_outcomes[SECTION_UNGROUNDED]
+            if section_outcomes[SECTION_FAILED] or section_outcomes[SECTION_UNGROUNDED]:
+                logger.warning(
+                    f"Analysis of {request.document_name} is incomplete: {section_outcomes[SECTION_FAILED]} "
+                    f"section(s) failed, {section_outcomes[SECTION_UNGROUNDED]} had no knowledge base context"
+                )
             
             logger.info(f"Analysis completed. Found {result.total_issues} issues in {result.analysis_duration:.2f}s")
             return result
@@ -83,74 +239,305 @@ class RequirementsDebtAnalyzer:
             logger.error(f"Failed to analyze document {request.document_name}: {e}")
             raise
     
-    def _analyze_section(self, content: str, section_name: str, request: AnalysisRequest) -> List[DebtIssue]:
-        """Analyze a document section for debt issues"""
+    def _analyze_sections_concurrently(
+        self,
+        section_items: List[Tuple[str, str]],
+        request: AnalysisRequest,
+        progress_cb: Optional[Callable[[float], None]] = None
+    ) -> List[Tuple[str, List[DebtIssue]]]:
+        """Analyze sections with interactive Bedrock calls, returning (outcome, issues) per section"""
+        # Group sections so several share one Bedrock call, then analyze the groups
+        # concurrently, bounded so we stay within the account's Bedrock request quota
+        batch_size = max(1, settings.bedrock_sections_per_call)
+        batches = [
+            (start, section_items[start:start + batch_size])
+            for start in range(0, len(section_items), batch_size)
+        ]
+        
+        section_results = [(SECTION_FAILED, []) for _ in section_items]
+        max_workers = max(1, min(settings.bedrock_max_concurrency, len(batches)))
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {
+                executor.submit(self._analyze_section_batch, batch, request): start
+                for start, batch in batches
+            }
+            analyzed = 0
+            for future in as_completed(futures):
+                batch_results = future.result()
+                start = futures[future]
+                section_results[start:start + len(batch_results)] = batch_results
+                analyzed += len(batch_results)
+                if progress_cb:
+                    progress_cb(100.0 * analyzed / len(section_items))
+        
+        return section_results
+    
+    def _analyze_sections_with_batch_inference(
+        self, section_items: List[Tuple[str, str]], request: AnalysisRequest
+    ) -> Optional[List[Tuple[str, List[DebtIssue]]]]:
+        """Analyze sections in a Bedrock batch inference job, returning (outcome, issues) per section
+        
+        Returns None when batch inference is not configured or there are too few sections.
+        """
+        role_arn = settings.bedrock_batch_role_arn
+        if not role_arn:
+            logger.warning("BEDROCK_BATCH_ROLE_ARN is not set; analyzing sections interactively")
+            return None
+        
+        # Ground each section in the knowledge base and reuse cached analyses, as the
+        # interactive path does; only the remaining sections become batch records
+        section_results = [(SECTION_FAILED, []) for _ in section_items]
+        grounded = {}
+        kb_contexts = self._get_relevant_contexts(section_items)
+        for index, ((section_name, content), kb_context) in enumerate(zip(section_items, kb_contexts)):
+            if not kb_context:
+                section_results[index] = (SECTION_UNGROUNDED, [])
+                continue
+            
+            cached_analysis, cache_embedding, context_hash, content_key = self._lookup_cached_analysis(
+                section_name, content[:MAX_SECTION_CHARS], kb_context, request.severity_threshold
+            )
+            if cached_analysis:
+                section_results[index] = (SECTION_ANALYZED, self._extract_issues_from_analysis(
+                    cached_analysis, content, section_name, kb_context, request.document_content
+                ))
+            else:
+                grounded[f"{index:06d}"] = (
+                    index, section_name, content, kb_context, cache_embedding, context_hash, content_key
+                )
+        
+        if len(grounded) < BATCH_INFERENCE_MIN_RECORDS:
+            logger.warning(
+                f"Batch inference needs at least {BATCH_INFERENCE_MIN_RECORDS} uncached sections, "
+                f"got {len(grounded)}; analyzing sections interactively"
+            )
+            return None
+        
         try:
-            # Get relevant knowledge base context
-            kb_context = self._get_relevant_context(content, section_name)
-            
-            # Generate chain-of-thought analysis
-            cot_analysis = self._perform_chain_of_thought_analysis(
-                content, section_name, kb_context
+            # Write one record per section, using the same prompts as interactive calls
+            system_prompt = self._get_system_prompt()
+            records = "\n".join(
+                json.dumps({
+                    'recordId': record_id,
+                    'modelInput': self.bedrock_client.build_text_request(
+                        self._create_analysis_prompt(
+                            content[:MAX_SECTION_CHARS], section_name, self._format_context_text(kb_context),
+                            request.severity_threshold
+                        ),
+                        system_prompt,
+                        temperature=0.3,
+                        max_tokens=4000,
+                        assistant_prefill=JSON_PREFILL
+                    )
+                })
+                for record_id, (_, section_name, content, kb_context, *_) in grounded.items()
             )
             
-            # Extract debt issues from analysis
-            issues = self._extract_issues_from_analysis(
-                cot_analysis, content, section_name, kb_context
+            s3_client = self.knowledge_base.s3_client
+            job_name = f"semp-analysis-{uuid4().hex[:12]}"
+            job_prefix = f"{settings.bedrock_batch_s3_prefix}{job_name}/"
+            input_key = f"{job_prefix}records.jsonl"
+            if not s3_client.upload_document(input_key, records.encode('utf-8')):
+                return None
+            
+            job_arn = self.bedrock_client.submit_batch_job(
+                job_name,
+                input_uri=f"s3://{s3_client.bucket}/{input_key}",
+                output_uri=f"s3://{s3_client.bucket}/{job_prefix}output/",
+                role_arn=role_arn
             )
+            status = self.bedrock_client.wait_for_batch_job(job_arn, timeout=settings.bedrock_batch_timeout)
+            if status not in ('Completed', 'PartiallyCompleted'):
+                logger.error(f"Batch inference job {job_name} ended with status {status}")
+                return None
+            
+            # Output is written under the job id as <input file>.out, one line per record
+            job_id = job_arn.rsplit('/', 1)[-1]
+            output = s3_client.download_document(f"{job_prefix}output/{job_id}/records.jsonl.out")
+            if output is None:
+                return None
+            
+            for line in output.decode('utf-8').splitlines():
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                entry = grounded.get(record.get('recordId'))
+                if entry is None or 'modelOutput' not in record:
+                    logger.warning(f"No model output for batch record {record.get('recordId')}: {record.get('error')}")
+                    continue
+                
+                index, section_name, content, kb_context, cache_embedding, context_hash, content_key = entry
+                analysis = self._parse_analysis_response(
+                    self.bedrock_client.extract_generated_text(record['modelOutput'], JSON_PREFILL)
+                )
+                if not analysis:
+                    continue
+                if cache_embedding is not None:
+                    self.analysis_cache.store(cache_embedding, section_name, context_hash, analysis, content_key=content_key)
+                section_results[index] = (SECTION_ANALYZED, self._extract_issues_from_analysis(
+                    analysis, content, section_name, kb_context, request.document_content
+                ))
             
-            return issues
+            return section_results
             
         except Exception as e:
-            logger.error(f"Failed to analyze section {section_name}: {e}")
-            return []
+            logger.error(f"Batch inference analysis failed: {e}")
+            return None
     
-    def _get_relevant_context(self, content: str, section_name: str) -> List[Dict]:
-        """Get relevant context from knowledge base"""
-        # Create search query based on content and section
-        search_queries = [
-            f"requirements debt {section_name}",
-            f"SEMP best practices {section_name}",
-            content[:200]  # First 200 chars for context
-        ]
+    def _analyze_section_batch(
+        self, batch: List[Tuple[str, str]], request: AnalysisRequest
+    ) -> List[Tuple[str, List[DebtIssue]]]:
+        """Analyze a group of (section_name, content) sections, returning (outcome, issues) per section"""
+        section_results = [(SECTION_FAILED, []) for _ in batch]
+        
+        try:
+            # Get relevant knowledge base context for each section
+            grounded = []
+            kb_contexts = self._get_relevant_contexts(batch)
+            for index, ((section_name, content), kb_context) in enumerate(zip(batch, kb_contexts)):
+                # Without grounding references the model output can't be cited, so skip the LLM call
+                if not kb_context:
+                    logger.warning(f"No knowledge base context for section {section_name}; skipping analysis")
+                    section_results[index] = (SECTION_UNGROUNDED, [])
+                    continue
+                grounded.append((index, section_name, content, kb_context))
+            
+            if not grounded:
+                return section_results
+            
+            # Generate chain-of-thought analyses on the length-limited content
+            cot_analyses = self._perform_chain_of_thought_analysis([
+                (section_name, content[:MAX_SECTION_CHARS], kb_context)
+                for _, section_name, content, kb_context in grounded
+            ], request.severity_threshold)
+            
+            # Extract debt issues from each analysis; an empty analysis means the model call failed
+            for (index, section_name, content, kb_context), cot_analysis in zip(grounded, cot_analyses):
+                if cot_analysis:
+                    section_results[index] = (SECTION_ANALYZED, self._extract_issues_from_analysis(
+                        cot_analysis, content, section_name, kb_context, request.document_content
+                    ))
+            
+        except Exception as e:
+            logger.error(f"Failed to analyze sections {[name for name, _ in batch]}: {e}")
         
-        all_context = []
-        for query in search_queries:
-            results = self.knowledge_base.search_knowledge_base(
-                query, top_k=3, score_threshold=0.4  # Lower threshold to find more authoritative sources
+        return section_results
+    
+    def _get_relevant_contexts(self, section_items: List[Tuple[str, str]]) -> List[List[Dict]]:
+        """Get relevant knowledge base context for several sections with one search"""
+        # Create search queries based on content and section
+        section_queries = [
+            (
+                f"requirements debt {section_name}",
+                f"SEMP best practices {section_name}",
+                content[:200]  # First 200 chars for context
             )
-            all_context.extend(results)
+            for section_name, content in section_items
+        ]
+        
+        # Search each distinct query once across all sections
+        unique_queries = list(dict.fromkeys(query for queries in section_queries for query in queries))
+        batch_results = self.knowledge_base.search_knowledge_base_batch(
+            unique_queries, top_k=3, score_threshold=0.4  # Lower threshold to find more authoritative sources
+        )
+        results_by_query = dict(zip(unique_queries, batch_results))
         
-        # Remove duplicates and return top results
-        unique_context = {}
-        for ctx in all_context:
-            key = f"{ctx['document']}_{ctx['chunk_index']}"
-            if key not in unique_context or ctx['score'] > unique_context[key]['score']:
-                unique_context[key] = ctx
+        contexts = []
+        for queries in section_queries:
+            # Remove duplicates, keeping the best-scoring hit per chunk
+            unique_context = {}
+            for query in queries:
+                for ctx in results_by_query[query]:
+                    key = (ctx['document'], ctx['chunk_index'])
+                    best = unique_context.get(key)
+                    if best is None or ctx['score'] > best['score']:
+                        unique_context[key] = ctx
+            
+            contexts.append(heapq.nlargest(MAX_CONTEXT_CHUNKS, unique_context.values(), key=SCORE_KEY))
         
-        return list(unique_context.values())[:5]  # Top 5 most relevant
+        return contexts
     
     def _perform_chain_of_thought_analysis(
-        self, content: str, section_name: str, context: List[Dict]
-    ) -> Dict[str, Any]:
-        """Perform chain-of-thought analysis on the content"""
+        self, sections: List[Tuple[str, str, List[Dict]]], severity_threshold: SeverityLevel = SeverityLevel.LOW
+    ) -> List[Dict[str, Any]]:
+        """Perform chain-of-thought analysis on (section_name, content, context) entries
         
-        # Prepare context text
-        context_text = "\n".join([
-            f"Reference: {ctx['document']} (score: {ctx['score']:.2f})\n{ctx['text']}\n"
-            for ctx in context
-        ])
+        Sections without a cached analysis are sent to the model together in one request.
+        """
+        analyses = [{} for _ in sections]
+        pending = []
         
-        system_prompt = self._get_system_prompt()
-        user_prompt = self._create_analysis_prompt(content, section_name, context_text)
+        for index, (section_name, content, context) in enumerate(sections):
+            cached_analysis, cache_embedding, context_hash, content_key = self._lookup_cached_analysis(
+                section_name, content, context, severity_threshold
+            )
+            if cached_analysis:
+                analyses[index] = cached_analysis
+            else:
+                pending.append((index, cache_embedding, context_hash, content_key))
+        
+        batch_analyses = []
+        if len(pending) > 1:
+            batch_analyses = self._generate_batch_analysis(
+                [sections[entry[0]] for entry in pending], severity_threshold
+            )
         
+        for position, (index, cache_embedding, context_hash, content_key) in enumerate(pending):
+            section_name, content, context = sections[index]
+            analysis = batch_analyses[position] if position < len(batch_analyses) else {}
+            
+            # Analyze on its own if it was the only uncached section or the batched response missed it
+            if not analysis:
+                analysis = self._generate_analysis(section_name, content, context, severity_threshold)
+            
+            if analysis and cache_embedding is not None:
+                self.analysis_cache.store(cache_embedding, section_name, context_hash, analysis, content_key=content_key)
+            
+            analyses[index] = analysis
+        
+        return analyses
+    
+    def _lookup_cached_analysis(
+        self, section_name: str, content: str, context: List[Dict], severity_threshold: SeverityLevel
+    ) -> Tuple[Optional[Dict[str, Any]], Optional[Any], str, str]:
+        """Look up a prior analysis of a section, returning (analysis, embedding, context hash, content key)
+        
+        The embedding is None when it wasn't needed (exact hit) or couldn't be computed.
+        """
+        # Reuse a prior analysis of an identical section, which needs no embedding call
+        context_hash = self.analysis_cache.context_hash(context, severity_threshold.value)
+        content_key = self.analysis_cache.content_key(section_name, content, context_hash)
+        cached_analysis = self.analysis_cache.lookup_exact(content_key)
+        if cached_analysis:
+            return cached_analysis, None, context_hash, content_key
+        
+        # Otherwise reuse a prior analysis of a near-identical section if one is cached
+        cache_embedding = None
+        try:
+            normalized_content = " ".join(content.split())
+            cache_embedding = self.bedrock_client.get_embeddings(f"{section_name}\n{normalized_content}")
+            cached_analysis = self.analysis_cache.lookup(cache_embedding, section_name, context_hash)
+        except Exception as e:
+            logger.warning(f"Semantic cache lookup failed for section {section_name}: {e}")
+        
+        return cached_analysis, cache_embedding, context_hash, content_key
+    
+    def _generate_analysis(
+        self, section_name: str, content: str, context: List[Dict], severity_threshold: SeverityLevel
+    ) -> Dict[str, Any]:
+        """Ask the model to analyze a single section"""
         try:
-            analysis_text = self.bedrock_client.generate_text(
+            user_prompt = self._create_analysis_prompt(
+                content, section_name, self._format_context_text(context), severity_threshold
+            )
+            
+            analysis_text = "".join(self.bedrock_client.generate_text_stream(
                 prompt=user_prompt,
-                system_prompt=system_prompt,
+                system_prompt=self._get_system_prompt(),
                 temperature=0.3,
-                max_tokens=4000
-            )
+                max_tokens=4000,
+                assistant_prefill=JSON_PREFILL
+            ))
             
             # Parse the structured response
             return self._parse_analysis_response(analysis_text)
@@ -159,73 +546,79 @@ class RequirementsDebtAnalyzer:
             logger.error(f"Failed to perform chain-of-thought analysis: {e}")
             return {}
     
+    def _generate_batch_analysis(
+        self, sections: List[Tuple[str, str, List[Dict]]], severity_threshold: SeverityLevel
+    ) -> List[Dict[str, Any]]:
+        """Ask the model to analyze several sections in one request, returning analyses in order"""
+        try:
+            user_prompt = self._create_batch_analysis_prompt(sections, severity_threshold)
+            
+            # The output budget is the model's limit, not per section; a truncated
+            # response fails to parse and the sections are retried individually
+            analysis_text = "".join(self.bedrock_client.generate_text_stream(
+                prompt=user_prompt,
+                system_prompt=self._get_system_prompt(),
+                temperature=0.3,
+                max_tokens=4000,
+                assistant_prefill=JSON_PREFILL
+            ))
+            
+            # Match analyses back to sections by the id tagged on each section in the prompt
+            analysis = self._parse_analysis_response(analysis_text)
+            by_id = {
+                str(entry.get('section_id')): entry
+                for entry in analysis.get('analyses', [])
+                if isinstance(entry, dict)
+            }
+            
+            return [by_id.get(f"s{number}", {}) for number in range(1, len(sections) + 1)]
+            
+        except Exception as e:
+            logger.error(f"Failed to perform batched chain-of-thought analysis: {e}")
+            return []
+    
     def _extract_issues_from_analysis(
-        self, analysis: Dict[str, Any], content: str, section_name: str, context: List[Dict]
+        self, analysis: Dict[str, Any], content: str, section_name: str, context: List[Dict], full_text: str
     ) -> List[DebtIssue]:
-        """Extract debt issues from the chain-of-thought analysis"""
+        """Extract debt issues from the chain-of-thought analysis, locating them in the full document text"""
         issues = []
         
         try:
             analysis_results = analysis.get('issues', [])
+            if not analysis_results:
+                return issues
+            
+            # Knowledge base references depend only on the context, so build them once per section
+            references = self._build_references(context)
+            reference_text = self._format_references(references)
             
             for issue_data in analysis_results:
-                # Create knowledge base references (filter to authoritative sources only)
-                references = []
-                
-                # Define authoritative sources that can be cited (exclude survey responses)
-                authoritative_sources = {
-                    'incose_sehb5.pdf': 'INCOSE Systems Engineering Handbook',
-                    'nasa_systems_engineering_handbook_0.pdf': 'NASA Systems Engineering Handbook',
-                    'requirements_debt_detection_guide.txt': 'Requirements Debt Detection Guide',
-                    'fundamentals_se_rq.pdf': 'Fundamentals of SE Requirements',
-                    'seli-guide-rev2.pdf': 'Systems Engineering Leadership Guide',
-                    'systems engineering - 2023 - kleinwaks': 'Technical Debt in Systems Engineering (Kleinwaks 2023)'
-                }
-                
-                for ctx in context:
-                    if ctx['score'] > 0.4:  # Lower threshold to include more authoritative sources
-                        doc_name_lower = ctx['document'].lower()
-                        # Only include authoritative sources, exclude survey responses
-                        if not doc_name_lower.startswith('combined_responses'):
-                            # Check if it's one of our known authoritative sources
-                            display_name = ctx['document']
-                            for auth_key, auth_name in authoritative_sources.items():
-                                if auth_key in doc_name_lower:
-                                    display_name = auth_name
-                                    break
-                            
-                            references.append(KnowledgeBaseReference(
-                                document_name=display_name,
-                                document_type=ctx.get('document_type', 'authoritative'),
-                                chunk_index=ctx['chunk_index'],
-                                relevance_score=ctx['score'],
-                                text_excerpt=ctx['text'][:200] + "..."
-                            ))
-                
                 # Parse debt type (handle multiple types)
                 debt_type = self._parse_debt_type(issue_data.get('type', 'Ambiguity'))
                 
+                issue_context = issue_data.get('context', '')
+                
                 # Enhanced location information with text snippet and coordinates
                 location_info = self._create_enhanced_location_with_coordinates(
                     issue_data.get('location', section_name), 
                     content, 
                     section_name,
-                    issue_data.get('context', ''),
-                    self.original_text
+                    issue_context,
+                    full_text
                 )
                 
                 # Create the debt issue
                 issue = DebtIssue(
-                    id=str(uuid.uuid4()),
+                    id=str(uuid4()),
                     location_in_text=location_info,
                     debt_type=debt_type,
                     problem_description=issue_data.get('problem', ''),
                     recommended_fix=issue_data.get('fix', ''),
-                    reference=self._format_references(references),
+                    reference=reference_text,
                     severity=SeverityLevel(issue_data.get('severity', 'Medium')),
                     confidence=float(issue_data.get('confidence', 0.8)),
                     section=section_name,
-                    context=issue_data.get('context', '')
+                    context=issue_context
                 )
                 
                 issues.append(issue)
@@ -235,113 +628,160 @@ class RequirementsDebtAnalyzer:
         
         return issues
     
+    def _build_references(self, context: List[Dict]) -> List[KnowledgeBaseReference]:
+        """Create knowledge base references from context (authoritative sources only)"""
+        references = []
+        
+        for ctx in context:
+            if ctx['score'] > 0.4:  # Lower threshold to include more authoritative sources
+                doc_name_lower = ctx['document'].lower()
+                # Only include authoritative sources, exclude survey responses
+                if doc_name_lower.startswith('combined_responses'):
+                    continue
+                
+                # Use the display name of known authoritative sources
+                display_name = next(
+                    (auth_name for auth_key, auth_name in AUTHORITATIVE_SOURCES.items() if auth_key in doc_name_lower),
+                    ctx['document']
+                )
+                
+                references.append(KnowledgeBaseReference(
+                    document_name=display_name,
+                    document_type=ctx.get('document_type', 'authoritative'),
+                    chunk_index=ctx['chunk_index'],
+                    relevance_score=ctx['score'],
+                    text_excerpt=f"{ctx['text'][:200]}..."
+                ))
+        
+        return references
+    
     def _get_system_prompt(self) -> str:
         """Get the system prompt for the analyzer"""
-        return """You are an expert assistant specializing in Requirements Engineering, Systems Engineering, and the detection of Requirements Debt (RQ Debt). Your primary task is to evaluate Systems Engineering Management Plans (SEMPs) for potential instances of RQ Debt.
+        return SYSTEM_PROMPT
+    
+    def _format_context_text(self, context: List[Dict]) -> str:
+        """Format knowledge base context for a prompt"""
+        return "\n".join([
+            f"Reference: {ctx['document']} (score: {ctx['score']:.2f})\n{ctx['text']}\n"
+            for ctx in context
+        ])
+    
+    def _severity_instruction(self, severity_threshold: SeverityLevel) -> str:
+        """Prompt line restricting findings to the requested severity threshold"""
+        if severity_threshold == SeverityLevel.LOW:
+            return ""
+        return (
+            f"\n\nOnly report issues with severity {severity_threshold.value} or higher. "
+            f"Do not include lower-severity findings."
+        )
+    
+    def _create_analysis_prompt(
+        self, content: str, section_name: str, context_text: str,
+        severity_threshold: SeverityLevel = SeverityLevel.LOW
+    ) -> str:
+        """Create the analysis prompt for a section"""
+        # Stable instructions lead so every request shares the same prompt prefix
+        return f"""{ANALYSIS_INSTRUCTIONS}
 
-When analyzing a SEMP section, you must:
-1. Apply Chain-of-Thought reasoning to explain your findings
-2. Identify specific debt types: ambiguity, incompleteness, inconsistency, traceability gaps, vague terminology, missing constraints, unclear acceptance criteria, conflicting requirements, outdated requirements, untestable requirements
-3. Provide practical improvements aligned with Systems Engineering standards
-4. Use the provided knowledge base references to support your evaluation
-5. Assess severity (Low, Medium, High, Critical) and confidence (0.0-1.0)
+Please analyze the following SEMP section for requirements debt:
 
-Your analysis should be thorough yet precise, highlighting uncertainty where human review is necessary.
+SECTION: {section_name}
 
-Respond in JSON format with this structure:
-{
-  "reasoning_steps": [
-    {
-      "step": 1,
-      "description": "Step description",
-      "evidence": ["evidence1", "evidence2"],
-      "conclusion": "Step conclusion"
-    }
-  ],
-  "issues": [
-    {
-      "location": "specific text phrase or exact quote from the document",
-      "type": "debt type",
-      "problem": "detailed problem description",
-      "fix": "recommended solution",
-      "severity": "Low|Medium|High|Critical",
-      "confidence": 0.8,
-      "context": "actual text snippet showing the issue (quote 2-3 sentences)"
-    }
-  ],
-  "overall_assessment": "Summary of findings"
-}"""
-    
-    def _create_analysis_prompt(self, content: str, section_name: str, context_text: str) -> str:
-        """Create the analysis prompt for a section"""
-        return f"""Please analyze the following SEMP section for requirements debt:
+CONTENT TO ANALYZE:
+{content}
 
+KNOWLEDGE BASE CONTEXT:
+{context_text}{self._severity_instruction(severity_threshold)}"""
+    
+    def _create_batch_analysis_prompt(
+        self, sections: List[Tuple[str, str, List[Dict]]], severity_threshold: SeverityLevel = SeverityLevel.LOW
+    ) -> str:
+        """Create one analysis prompt covering several sections"""
+        # Tag each section with an explicit id so section text can't be mistaken for a delimiter
+        section_blocks = "\n\n".join(
+            f"""<section id="s{number}">
 SECTION: {section_name}
 
 CONTENT TO ANALYZE:
-{content[:3000]}  # Limit content length
+{content}
 
 KNOWLEDGE BASE CONTEXT:
-{context_text}
+{self._format_context_text(context)}
+</section>"""
+            for number, (section_name, content, context) in enumerate(sections, 1)
+        )
+        
+        return f"""{ANALYSIS_INSTRUCTIONS}
 
-Apply chain-of-thought reasoning to identify potential requirements debt issues. For each issue found, provide:
-1. The exact location: Quote the specific text phrase or sentence where the issue occurs
-2. The specific debt type and problem description
-3. A recommended fix aligned with systems engineering best practices
-4. Severity and confidence assessment
-5. Context: Include 2-3 sentences from the document showing the problematic text
+Please analyze each of the following {len(sections)} SEMP sections for requirements debt. Analyze every section independently, using only the knowledge base context given inside that section's tags.
 
-IMPORTANT: In the 'location' field, include actual quoted text from the document, not just section names.
-In the 'context' field, provide the surrounding sentences that demonstrate the issue.
+{section_blocks}{self._severity_instruction(severity_threshold)}
 
-Focus on actionable findings that would help improve the SEMP's quality and reduce requirements debt."""
+Respond with one analysis per section, using the section ids above, in this JSON structure:
+{{"analyses": [{{"section_id": "s1", "reasoning_steps": [...], "issues": [...], "overall_assessment": "..."}}]}}
+Each analysis follows the response structure from your instructions."""
     
     def _parse_analysis_response(self, response_text: str) -> Dict[str, Any]:
         """Parse the structured analysis response"""
+        cleaned_text = ""
+        start_idx = -1
         try:
             # Clean the response text to remove control characters
-            import re
-            cleaned_text = re.sub(r'[\x00-\x1f\x7f-\x9f]', '', response_text)
+            cleaned_text = response_text.translate(CONTROL_CHAR_TABLE)
             
-            # Try to extract JSON from the response
+            # Decode the first JSON object in the response; any prose the
+            # model adds after the object is ignored
             start_idx = cleaned_text.find('{')
-            end_idx = cleaned_text.rfind('}') + 1
-            
-            if start_idx >= 0 and end_idx > start_idx:
-                json_text = cleaned_text[start_idx:end_idx]
-                # Additional cleanup for common JSON issues
-                json_text = json_text.replace('\n', ' ').replace('\t', ' ')
-                # Fix any double quotes within strings
-                # json_text = re.sub(r'(?<!\\)"(?!\s*[,}\]])', '\\"', json_text)
-                return json.loads(json_text)
+            if start_idx >= 0:
+                # Fast path: the response is just the JSON object, parsed with orjson
+                if orjson is not None:
+                    end_idx = cleaned_text.rfind('}') + 1
+                    try:
+                        return orjson.loads(cleaned_text[start_idx:end_idx])
+                    except orjson.JSONDecodeError:
+                        pass  # Trailing prose contains braces; fall through to raw_decode
+                
+                # Decode the first analysis object, skipping stray braces in leading prose
+                first_error = None
+                while start_idx >= 0:
+                    try:
+                        analysis, _ = JSON_DECODER.raw_decode(cleaned_text, start_idx)
+                        if isinstance(analysis, dict) and any(key in analysis for key in ANALYSIS_RESPONSE_KEYS):
+                            return analysis
+                    except json.JSONDecodeError as e:
+                        first_error = first_error or e
+                    start_idx = cleaned_text.find('{', start_idx + 1)
+                
+                if first_error:
+                    raise first_error
+                logger.warning("No analysis object found in analysis response")
+                return {}
             else:
                 logger.warning("Could not extract JSON from analysis response")
-                logger.debug(f"Response text: {cleaned_text[:500]}...")
+                logger.opt(lazy=True).debug("Response text: {}...", lambda: cleaned_text[:500])
                 return {}
                 
         except json.JSONDecodeError as e:
             logger.error(f"Failed to parse analysis response JSON: {e}")
-            logger.debug(f"Problematic JSON text: {json_text[:500] if 'json_text' in locals() else 'N/A'}...")
+            logger.opt(lazy=True).debug(
+                "Problematic JSON text: {}...", lambda: cleaned_text[max(start_idx, 0):max(start_idx, 0) + 500]
+            )
             return {}
     
     def _split_document_into_sections(self, content: str) -> Dict[str, str]:
         """Split document into analyzable sections"""
         sections = {}
         
-        # Simple section splitting based on headers
-        import re
-        
-        # Look for numbered sections, headers, etc.
-        section_pattern = r'(\d+\..*?(?=\d+\.|$))'
-        matches = re.split(section_pattern, content, flags=re.DOTALL)
+        # Stream numbered header lines in one linear scan, slicing the text between
+        # each header and the next without materializing the list of matches
+        previous = None
+        for match in SECTION_HEADER_PATTERN.finditer(content):
+            if previous is not None:
+                self._add_section(sections, content, previous, match.start())
+            previous = match
         
-        if len(matches) > 1:
-            for i in range(1, len(matches), 2):
-                if i + 1 < len(matches):
-                    header = matches[i].strip()[:100]  # First 100 chars as header
-                    section_content = matches[i + 1].strip()
-                    if section_content:
-                        sections[header] = section_content
+        if previous is not None:
+            self._add_section(sections, content, previous, len(content))
         else:
             # If no clear sections, split into chunks
             chunk_size = 2000
@@ -352,6 +792,14 @@ Focus on actionable findings that would help improve the SEMP's quality and redu
         
         return sections or {"Main Content": content}
     
+    @staticmethod
+    def _add_section(sections: Dict[str, str], content: str, header_match: re.Match, end: int) -> None:
+        """Add the text between a header match and end as a section, if it isn't empty"""
+        section_content = content[header_match.end():end].strip()
+        if section_content:
+            header = header_match.group(0).strip()[:100]  # First 100 chars as header
+            sections[header] = section_content
+    
     def _create_enhanced_location(self, raw_location: str, content: str, section_name: str, context: str) -> str:
         """Create clean, readable location information with section name and relevant quote"""
         try:
@@ -363,32 +811,29 @@ Focus on actionable findings that would help improve the SEMP's quality and redu
             if context and len(context.strip()) > 10:
                 # Clean up the context and extract a good quote
                 context_clean = context.strip()
-                # Take first sentence or up to 80 characters
-                if len(context_clean) > 80:
+                # Take first sentence or up to QUOTE_MAX characters
+                if len(context_clean) > QUOTE_MAX:
                     # Try to end at sentence boundary
-                    sentence_end = context_clean.find('.', 40)
-                    if sentence_end > 0 and sentence_end < 100:
+                    sentence_end = context_clean.find('.', 40, 100)
+                    if sentence_end > 0:
                         quote = context_clean[:sentence_end + 1]
                     else:
-                        quote = context_clean[:80] + "..."
+                        quote = f"{context_clean[:QUOTE_MAX]}..."
                 else:
                     quote = context_clean
             
             # If no context quote, try to extract from raw_location if it's a quote
             elif raw_location and raw_location != section_name and len(raw_location) > 10:
-                if len(raw_location) > 80:
-                    quote = raw_location[:80] + "..."
-                else:
-                    quote = raw_location
+                quote = f"{raw_location[:QUOTE_MAX]}..." if len(raw_location) > QUOTE_MAX else raw_location
             
             # If still no quote, get a meaningful snippet from content
             if not quote and len(content) > 50:
-                # Get first meaningful sentence
-                sentences = content.split('.', 2)
-                if len(sentences) > 1 and len(sentences[0]) > 20:
-                    quote = sentences[0].strip() + "."
+                # Get first meaningful sentence without splitting the whole section
+                sentence_end = content.find('.')
+                if sentence_end > 20:
+                    quote = f"{content[:sentence_end].strip()}."
                     if len(quote) > 100:
-                        quote = quote[:100] + "..."
+                        quote = f"{quote[:100]}..."
             
             # Format the final location
             if quote:
@@ -440,8 +885,10 @@ Focus on actionable findings that would help improve the SEMP's quality and redu
                 
                 # Embed coordinate info in the location string using a special format
                 # Format: "basic_location [COORDS:{json}]"
-                import json
-                coord_json = json.dumps(coord_info, separators=(',', ':'))
+                coord_json = (
+                    orjson.dumps(coord_info).decode('utf-8') if orjson is not None
+                    else json.dumps(coord_info, separators=(',', ':'))
+                )
                 return f"{basic_location} [COORDS:{coord_json}]"
             else:
                 return basic_location
@@ -461,34 +908,21 @@ Focus on actionable findings that would help improve the SEMP's quality and redu
             if ',' in debt_type_str:
                 debt_type_str = debt_type_str.split(',')[0].strip()
             
-            # Try to match against valid DebtType values
-            for debt_type in DebtType:
-                if debt_type.value.lower() == debt_type_str.lower():
-                    return debt_type
-                # Also check partial matches and variations
-                if debt_type_str.lower() in debt_type.value.lower() or debt_type.value.lower() in debt_type_str.lower():
-                    return debt_type
+            debt_type_lower = debt_type_str.lower()
             
-            # Handle common variations and mappings
-            debt_type_mappings = {
-                'traceability gaps': DebtType.TRACEABILITY_GAP,
-                'traceability gap': DebtType.TRACEABILITY_GAP,
-                'missing traceability': DebtType.TRACEABILITY_GAP,
-                'vague terms': DebtType.VAGUE_TERMINOLOGY,
-                'unclear terms': DebtType.VAGUE_TERMINOLOGY,
-                'missing acceptance criteria': DebtType.UNCLEAR_ACCEPTANCE_CRITERIA,
-                'conflicting': DebtType.CONFLICTING_REQUIREMENTS,
-                'outdated': DebtType.OUTDATED_REQUIREMENTS,
-                'untestable': DebtType.UNTESTABLE_REQUIREMENTS,
-                'incomplete': DebtType.INCOMPLETENESS,
-                'inconsistent': DebtType.INCONSISTENCY,
-                'ambiguous': DebtType.AMBIGUITY,
-                'debt management': DebtType.MISSING_CONSTRAINTS,  # Fallback for debt management issues
-            }
+            # Fast path: exact match against DebtType values or known variations
+            exact_match = DEBT_TYPE_BY_VALUE.get(debt_type_lower) or DEBT_TYPE_MAPPINGS.get(debt_type_lower)
+            if exact_match:
+                return exact_match
+            
+            # Also check partial matches and variations
+            for value_lower, debt_type in DEBT_TYPE_BY_VALUE.items():
+                if debt_type_lower in value_lower or value_lower in debt_type_lower:
+                    return debt_type
             
             # Check mappings
-            for key, mapped_type in debt_type_mappings.items():
-                if key in debt_type_str.lower():
+            for key, mapped_type in DEBT_TYPE_MAPPINGS.items():
+                if key in debt_type_lower:
                     return mapped_type
             
             # Default fallback
@@ -505,45 +939,51 @@ Focus on actionable findings that would help improve the SEMP's quality and redu
             return "No specific reference found"
         
         # Format as: "DocumentName (score: 0.XX); DocumentName2 (score: 0.YY)"
-        citations = []
-        for ref in references[:3]:  # Limit to top 3
-            # Extract just the document name without chunk info
-            doc_name = ref.document_name.split('.')[0] if '.' in ref.document_name else ref.document_name
-            citations.append(f"{doc_name} (score: {ref.relevance_score:.2f})")
-        
-        return "; ".join(citations)
-    
-    def _severity_meets_threshold(self, severity: SeverityLevel, threshold: SeverityLevel) -> bool:
-        """Check if severity meets the minimum threshold"""
-        severity_order = {
-            SeverityLevel.LOW: 1,
-            SeverityLevel.MEDIUM: 2,
-            SeverityLevel.HIGH: 3,
-            SeverityLevel.CRITICAL: 4
-        }
-        return severity_order[severity] >= severity_order[threshold]
-    
-    def _calculate_severity_distribution(self, issues: List[DebtIssue]) -> Dict[str, int]:
-        """Calculate distribution of issues by severity"""
-        distribution = {level.value: 0 for level in SeverityLevel}
-        for issue in issues:
-            distribution[issue.severity.value] += 1
-        return distribution
+        # using just the document name without extension, limited to the top 3
+        return "; ".join(
+            f"{ref.document_name.partition('.')[0]} (score: {ref.relevance_score:.2f})"
+            for ref in references[:3]
+        )
     
-    def _calculate_debt_type_distribution(self, issues: List[DebtIssue]) -> Dict[str, int]:
-        """Calculate distribution of issues by debt type"""
-        distribution = {debt_type.value: 0 for debt_type in DebtType}
+    def _filter_issues_with_distributions(
+        self, issues: List[DebtIssue], threshold: SeverityLevel
+    ) -> Tuple[List[DebtIssue], Dict[str, int], Dict[str, int]]:
+        """Filter issues by severity threshold and count distributions of the kept issues in one pass"""
+        threshold_rank = SEVERITY_RANK[threshold]
+        filtered_issues = []
+        severity_counts = Counter()
+        debt_type_counts = Counter()
         for issue in issues:
-            distribution[issue.debt_type.value] += 1
-        return distribution
+            if SEVERITY_RANK[issue.severity] >= threshold_rank:
+                filtered_issues.append(issue)
+                severity_counts[issue.severity.value] += 1
+                debt_type_counts[issue.debt_type.value] += 1
+        
+        return (
+            filtered_issues,
+            {value: severity_counts[value] for value in SEVERITY_VALUES},
+            {value: debt_type_counts[value] for value in DEBT_TYPE_VALUES}
+        )
     
     def _generate_analysis_summary(self, result: AnalysisResult) -> Dict[str, Any]:
         """Generate a summary of the analysis results"""
+        # Gather per-issue statistics in a single pass
+        confidence_total = 0.0
+        sections = set()
+        recommendations = 0
+        for issue in result.issues:
+            confidence_total += issue.confidence
+            if issue.section:
+                sections.add(issue.section)
+            if issue.recommended_fix:
+                recommendations += 1
+        
+        issue_count = len(result.issues)
         return {
             "total_issues": result.total_issues,
             "high_severity_issues": result.severity_distribution.get("High", 0) + result.severity_distribution.get("Critical", 0),
-            "most_common_debt_type": max(result.debt_type_distribution.items(), key=lambda x: x[1])[0] if result.debt_type_distribution else "None",
-            "average_confidence": sum(issue.confidence for issue in result.issues) / len(result.issues) if result.issues else 0.0,
-            "sections_analyzed": len(set(issue.section for issue in result.issues if issue.section)),
-            "recommendations_provided": len([issue for issue in result.issues if issue.recommended_fix])
+            "most_common_debt_type": max(result.debt_type_distribution, key=result.debt_type_distribution.get, default="None"),
+            "average_confidence": confidence_total / issue_count if issue_count else 0.0,
+            "sections_analyzed": len(sections),
+            "recommendations_provided": recommendations
         }
\ No newline at end of file
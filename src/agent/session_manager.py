@@ -1,47 +1,357 @@
 """
 Chat session manager for interactive SEMP analysis
 """
+import gzip
+import hashlib
+import json
+import os
+import queue
+import re
+import threading
+import time
 import uuid
-from typing import List, Dict, Optional, Any
+from concurrent.futures import ThreadPoolExecutor
+from itertools import chain
+from typing import TYPE_CHECKING, List, Dict, Optional, Any, Sequence, Tuple
 from datetime import datetime
 from loguru import logger
 
+from src.infrastructure.bedrock_client import BedrockClient
 from src.infrastructure.dynamodb_client import DynamoDBChatClient
-from src.models.debt_models import ChatSession, AnalysisResult, AnalysisRequest
-from src.agent.debt_analyzer import RequirementsDebtAnalyzer
-from src.rag.knowledge_base import SEMPKnowledgeBase
+from src.infrastructure.ttl_cache import TTLCache
+from src.models.debt_models import ChatSession, AnalysisResult, AnalysisRequest, DebtIssue
 from config.settings import settings
 
+try:
+    import orjson
+except ImportError:  # Fall back to the stdlib codec when orjson is unavailable
+    orjson = None
+
+if TYPE_CHECKING:
+    from src.agent.debt_analyzer import RequirementsDebtAnalyzer
+    from src.rag.knowledge_base import SEMPKnowledgeBase
+
+# DynamoDB reads and writes issued together on a chat turn
+DB_WORKERS = 4
+
+# Write-behind queue for chat messages: capacity, coalescing window (seconds) and retries
+WRITE_QUEUE_SIZE = 1000
+WRITE_COALESCE_SECONDS = 0.2
+WRITE_BATCH_SIZE = 25
+WRITE_MAX_ATTEMPTS = 4
+
+# Issue fields the chat handlers read back from a stored session analysis
+CHAT_ISSUE_FIELDS = frozenset({
+    'debt_type', 'problem_description', 'location_in_text', 'recommended_fix',
+    'severity', 'confidence', 'reference'
+})
+
+# Analysis fields kept, alongside the issues, in a session's stored analysis
+ANALYSIS_RECORD_FIELDS = (
+    'document_name', 'document_id', 'total_issues', 'summary',
+    'severity_distribution', 'debt_type_distribution'
+)
+
+# Analysis results kept in process, keyed by content, options and model (see _analysis_key);
+# bump the version when AnalysisResult or the analysis prompts change
+RESULT_CACHE_SIZE = 32
+RESULT_CACHE_TTL = 86400.0
+ANALYSIS_RESULT_VERSION = "1"
+
+# Characters of document text encoded at a time while hashing it
+CONTENT_HASH_SLICE_CHARS = 1 << 20
+
+# Decoded session analyses, keyed by session and stored version
+ANALYSIS_CACHE_SIZE = 256
+ANALYSIS_CACHE_TTL = 600.0
+
+# Generated answers reused for repeated questions over the same knowledge base context
+RESPONSE_CACHE_SIZE = 512
+RESPONSE_CACHE_TTL = 3600.0
+
+# Severities listed by the high priority issues view
+HIGH_SEVERITY_LEVELS = ("High", "Critical")
+
+# Passages sharing this fraction of their words count as duplicates; question context budget (characters)
+PASSAGE_DUPLICATE_JACCARD = 0.85
+QUESTION_CONTEXT_CHARS = 1500
+
+# Phrases marking explicit document analysis requests (action + document reference)
+ANALYSIS_REQUEST_PHRASES = (
+    "analyze this document", "analyze my semp", "check this document", "review this semp",
+    "analyze document", "process this semp", "upload document", "upload file",
+    "analyze the document", "check my semp", "review document"
+)
+
+# Phrases marking results/findings queries (asking about existing analysis)
+RESULTS_REQUEST_PHRASES = (
+    "show results", "view findings", "analysis results", "show issues",
+    "view results", "display results", "last analysis", "previous analysis",
+    "show summary", "analysis summary", "show findings", "latest results"
+)
+
+# Greetings and acknowledgements carry nothing worth retrieving or looking up
+LOW_SIGNAL_MESSAGE_PATTERN = re.compile(
+    r"^\W*(?:(?:hi|hello|hey|thanks|thank you|thx|ok|okay|cool|great|yes|no|bye|help)\W*)+$",
+    re.IGNORECASE
+)
+
+# Phrases marking questions about specific issues in the session's analysis, matched in one scan
+ANALYSIS_INDICATOR_PHRASES = (
+    'this issue', 'this problem', 'this debt', 'this requirement',
+    'vague terminology', 'ambiguity', 'incompleteness', 'inconsistency',
+    'traceability gap', 'unclear acceptance', 'untestable', 'conflicting',
+    'reliability', 'measurable terms', 'verify compliance', 'problematic',
+    'should it be addressed', 'how should', 'what makes this',
+    'why is this', 'how to fix', 'recommended fix',
+    'ambiguity issue', 'requirements management process', 'change control',
+    'lack of a clear', 'lack of a defined', 'does not describe',
+    'explain more about', 'tell me about', 'what is problematic'
+)
+ANALYSIS_INDICATOR_PATTERN = re.compile("|".join(map(re.escape, ANALYSIS_INDICATOR_PHRASES)), re.IGNORECASE)
+
+# Word tokens for matching questions against issue text
+WORD_PATTERN = re.compile(r"\w+")
+
+# Quoted text in a question, e.g. an excerpt of an issue's problem description
+QUOTED_TEXT_PATTERN = re.compile(r'"([^"]+)"')
+
+# Both phrase sets compiled into one case-insensitive scan, one named group per request type
+REQUEST_CLASSIFIER_PATTERN = re.compile(
+    "(?P<analyze_document>{})|(?P<view_results>{})".format(
+        "|".join(map(re.escape, ANALYSIS_REQUEST_PHRASES)),
+        "|".join(map(re.escape, RESULTS_REQUEST_PHRASES))
+    ),
+    re.IGNORECASE
+)
+
+# Results views named in a results query, one named group each, in order of precedence
+RESULTS_VIEW_PATTERN = re.compile(
+    r"(?P<summary>summary)|(?P<table>table|format)|(?P<high_severity>high|critical)",
+    re.IGNORECASE
+)
+RESULTS_VIEW_PRECEDENCE = ("summary", "table", "high_severity")
+
+# Question markers for messages that aren't analysis or results requests
+QUESTION_MARKER_PATTERN = re.compile(r"\?|what|how|why|when|where", re.IGNORECASE)
+
+# Fixed chat responses
+WELCOME_MESSAGE = "Hello! I'm your SEMP Requirements Debt Analyzer. I can help you identify and analyze requirements debt in Systems Engineering Management Plans. You can upload a SEMP document for analysis or ask questions about requirements engineering best practices."
+
+DOCUMENT_ANALYSIS_RESPONSE = """I'm ready to analyze your SEMP document for requirements debt. Please provide the document content in one of these ways:
+
+1. **Paste the text directly** into the chat
+2. **Upload a file** (if using the file upload feature)
+3. **Provide a document URL** or S3 key if it's already in the knowledge base
+
+Once you provide the document, I'll analyze it for potential requirements debt issues including:
+- Ambiguity and vague terminology
+- Incompleteness and missing constraints  
+- Inconsistency and conflicting requirements
+- Traceability gaps
+- Unclear acceptance criteria
+- Untestable requirements
+
+The analysis will include specific locations, problem descriptions, recommended fixes, and references to best practices from my knowledge base."""
+
+GENERAL_CONVERSATION_RESPONSE = """I'm specialized in analyzing Systems Engineering Management Plans (SEMPs) for requirements debt. I can help you with:
+
+🔍 **Document Analysis**: Identify debt issues like ambiguity, incompleteness, and inconsistencies
+📊 **Results Review**: View analysis findings in structured tables with recommendations  
+❓ **Q&A**: Answer questions about requirements engineering best practices
+📚 **Knowledge Base**: Reference authoritative sources and standards
+
+How would you like to proceed? You can:
+- Share a SEMP document for analysis
+- Ask about specific requirements engineering topics
+- Request help with understanding requirements debt types"""
+
+NO_ANALYSIS_RESULTS_RESPONSE = "I don't have any recent analysis results to show. Please analyze a SEMP document first by providing the document content."
+
+# System prompts for explaining analysis results. Each carries all of its handler's fixed
+# instructions, so the whole invariant part of the request is one cacheable prefix
+SYSTEM_PROMPT_ISSUE_EXPLAINER = """You are an expert Requirements Engineering consultant. Provide clear, educational explanations about requirements debt issues. Be conversational, helpful, and focus on practical guidance that helps the user understand both the problem and the solution.
+
+You will be given one issue found in a SEMP document analysis and the user's question about it. Provide a comprehensive, conversational explanation that addresses:
+1. What makes this specific issue problematic in systems engineering
+2. Why this type of requirements debt matters
+3. How to implement the recommended fix practically
+4. What could happen if this isn't addressed
+5. Any additional insights or best practices
+
+Be specific to this exact issue, not generic. Make it educational and actionable."""
+
+SYSTEM_PROMPT_ANALYSIS_GUIDANCE = """You are an expert Requirements Engineering consultant. Provide actionable guidance about requirements debt analysis results. Be conversational, helpful, and focus on practical next steps.
+
+You will be given the results of a SEMP requirements debt analysis and the user's question about them. Provide helpful guidance that:
+1. Interprets what these results mean
+2. Suggests practical next steps prioritized by impact
+3. Explains why certain types of issues matter more
+4. Offers specific advice for improving the SEMP document
+5. Answers the user's question in this context
+
+Be specific to these results, not generic. Make it actionable and educational."""
+
+# Templates for analysis result messages, filled with str.format_map
+ANALYSIS_COMPLETE_TEMPLATE = """## Analysis Complete: {document_name}
+
+**Summary:**
+- **Total Issues Found:** {total_issues}
+- **High/Critical Issues:** {high_severity_issues}
+- **Analysis Duration:** {analysis_duration:.2f} seconds
+- **Average Confidence:** {average_confidence:.2f}
+
+**Issue Distribution:**
+{severity_lines}
+
+**Most Common Debt Type:** {most_common_debt_type}
+
+Would you like to see the detailed results in a table format or focus on specific types of issues?"""
+
+ANALYSIS_SUMMARY_TEMPLATE = """## Analysis Summary
+
+**Overall Results:**
+- Total Issues: {total_issues}
+- High/Critical Issues: {high_severity_issues}
+- Sections Analyzed: {sections_analyzed}
+- Average Confidence: {average_confidence:.2f}
+
+**Issue Breakdown:**
+- Most Common Issue: {most_common_debt_type}
+- Recommendations Provided: {recommendations_provided}
+
+Would you like to see the detailed table or focus on specific severity levels?"""
+
+GENERAL_RESULTS_TEMPLATE = """## Analysis Results Overview
+
+The analysis found **{total_issues} total issues** in the document.
+
+**Severity Breakdown:**
+{severity_lines}
+
+**Debt Type Breakdown:**
+{debt_type_lines}
+
+Would you like to see:
+1. Detailed table format
+2. Only high/critical issues  
+3. Issues of a specific type
+4. Analysis summary
+
+Just let me know what you'd prefer!"""
+
+
+# Markdown results table, showing at most TABLE_MAX_ISSUES rows
+TABLE_MAX_ISSUES = 10
+ANALYSIS_TABLE_HEADER = """## Requirements Debt Analysis Results
+
+| Location in Text | Debt Type / Problem | Recommended Fix | Reference | Severity |
+|-----------------|-------------------|-----------------|-----------|----------|
+"""
+
+
+def _uuid7() -> uuid.UUID:
+    """Time-ordered UUID (version 7): 48-bit millisecond timestamp followed by random bits"""
+    if hasattr(uuid, "uuid7"):
+        return uuid.uuid7()
+    value = (time.time_ns() // 1_000_000) << 80 | int.from_bytes(os.urandom(10), "big")
+    value = value & ~(0xF << 76) | (0x7 << 76)  # version 7
+    value = value & ~(0x3 << 62) | (0x2 << 62)  # RFC 4122 variant
+    return uuid.UUID(int=value)
+
+
+def _ellipsize(text: str, limit: int) -> str:
+    """Truncate text to limit characters, marking the cut with an ellipsis"""
+    return text if len(text) <= limit else text[:limit] + "..."
+
+
+def _question_digest(question: str) -> bytes:
+    """Digest of a question with case and whitespace normalized, for response cache keys"""
+    return hashlib.blake2b(" ".join(question.lower().split()).encode('utf-8'), digest_size=16).digest()
+
+
+def _content_digest(text: str) -> str:
+    """SHA-256 of a document's UTF-8 text, encoded slice by slice rather than as one copy"""
+    digest = hashlib.sha256()
+    for start in range(0, len(text), CONTENT_HASH_SLICE_CHARS):
+        digest.update(text[start:start + CONTENT_HASH_SLICE_CHARS].encode('utf-8'))
+    return digest.hexdigest()
+
+
+def _count_lines(distribution: Dict[str, int]) -> str:
+    """Render the non-zero entries of a distribution as markdown bullet lines"""
+    return "\n".join(f"- **{name}:** {count} issues" for name, count in distribution.items() if count > 0)
+
 
 class SEMPChatSessionManager:
     """Manages chat sessions for SEMP analysis"""
     
+    __slots__ = (
+        "db_client", "bedrock_client", "_db_executor", "_write_queue", "_writer",
+        "_init_lock", "_knowledge_base", "_analyzer", "_response_cache", "_analysis_cache",
+        "_result_cache"
+    )
+    
     def __init__(self):
-        self.db_client = DynamoDBChatClient()
-        self.knowledge_base = SEMPKnowledgeBase()
-        self.analyzer = RequirementsDebtAnalyzer(self.knowledge_base)
+        self.db_client = DynamoDBChatClient.instance()
+        self.bedrock_client = BedrockClient.instance()
+        
+        # Independent DynamoDB round-trips within a turn are overlapped on this pool
+        self._db_executor = ThreadPoolExecutor(max_workers=DB_WORKERS, thread_name_prefix="dynamodb")
+        
+        # Chat messages are persisted by a background writer so replies aren't held up by DynamoDB
+        self._write_queue: "queue.Queue[Tuple[str, Sequence[Tuple[str, str, Optional[Dict]]]]]" = queue.Queue(
+            maxsize=WRITE_QUEUE_SIZE
+        )
+        self._writer = threading.Thread(target=self._drain_writes, name="chat-writer", daemon=True)
+        self._writer.start()
+        
+        # The knowledge base and analyzer are built on first use (see the properties below)
+        self._init_lock = threading.RLock()
+        self._knowledge_base: Optional["SEMPKnowledgeBase"] = None
+        self._analyzer: Optional["RequirementsDebtAnalyzer"] = None
+        
+        self._response_cache = TTLCache(maxsize=RESPONSE_CACHE_SIZE, ttl=RESPONSE_CACHE_TTL)
+        self._analysis_cache = TTLCache(maxsize=ANALYSIS_CACHE_SIZE, ttl=ANALYSIS_CACHE_TTL)
+        self._result_cache = TTLCache(maxsize=RESULT_CACHE_SIZE, ttl=RESULT_CACHE_TTL)
         
         logger.info("SEMP Chat Session Manager initialized")
     
+    @property
+    def knowledge_base(self) -> "SEMPKnowledgeBase":
+        """Knowledge base, loaded the first time a question needs retrieval"""
+        if self._knowledge_base is None:
+            from src.rag.knowledge_base import SEMPKnowledgeBase
+            
+            with self._init_lock:
+                if self._knowledge_base is None:
+                    self._knowledge_base = SEMPKnowledgeBase.instance()
+        return self._knowledge_base
+    
+    @property
+    def analyzer(self) -> "RequirementsDebtAnalyzer":
+        """Debt analyzer, built the first time a document is analyzed"""
+        if self._analyzer is None:
+            from src.agent.debt_analyzer import RequirementsDebtAnalyzer
+            
+            with self._init_lock:
+                if self._analyzer is None:
+                    self._analyzer = RequirementsDebtAnalyzer(self.knowledge_base)
+        return self._analyzer
+    
     def create_session(self, user_id: str = "default") -> str:
         """Create a new chat session"""
-        session_id = str(uuid.uuid4())
+        # Time-ordered ids sort by creation time, e.g. when listing or exporting sessions
+        session_id = str(_uuid7())
         
         try:
-            # Create session in DynamoDB
-            success = self.db_client.create_chat_session(session_id, user_id)
+            # Create session in DynamoDB, seeded with the welcome message in the same write
+            success = self.db_client.create_chat_session(
+                session_id, user_id, [("assistant", WELCOME_MESSAGE, {"type": "welcome"})]
+            )
             
             if success:
                 logger.info(f"Created chat session: {session_id}")
-                
-                # Add welcome message
-                self.add_message(
-                    session_id,
-                    "assistant",
-                    "Hello! I'm your SEMP Requirements Debt Analyzer. I can help you identify and analyze requirements debt in Systems Engineering Management Plans. You can upload a SEMP document for analysis or ask questions about requirements engineering best practices.",
-                    {"type": "welcome"}
-                )
-                
                 return session_id
             else:
                 logger.error("Failed to create chat session in database")
@@ -58,17 +368,69 @@ class SEMPChatSessionManager:
         content: str, 
         metadata: Optional[Dict] = None
     ) -> bool:
-        """Add a message to the chat session"""
+        """Queue a message for the chat session"""
+        return self.add_messages(session_id, [(role, content, metadata)])
+    
+    def add_messages(self, session_id: str, messages: Sequence[Tuple[str, str, Optional[Dict]]]) -> bool:
+        """Queue several (role, content, metadata) messages for the chat session
+        
+        Messages are written in order by the background writer; reads of the
+        chat history wait for queued messages first.
+        """
         try:
-            return self.db_client.add_message(session_id, role, content, metadata)
-        except Exception as e:
-            logger.error(f"Failed to add message to session {session_id}: {e}")
+            self._write_queue.put((session_id, list(messages)), timeout=5)
+            return True
+        except queue.Full:
+            logger.error(f"Chat message queue is full, dropping messages for session {session_id}")
             return False
     
+    def flush(self) -> None:
+        """Block until every queued message has been written"""
+        self._write_queue.join()
+    
+    def _drain_writes(self) -> None:
+        """Background loop writing queued messages, coalesced per session"""
+        get = self._write_queue.get
+        task_done = self._write_queue.task_done
+        
+        while True:
+            batch = [get()]
+            deadline = time.monotonic() + WRITE_COALESCE_SECONDS
+            while len(batch) < WRITE_BATCH_SIZE:
+                try:
+                    batch.append(get(timeout=max(0.0, deadline - time.monotonic())))
+                except queue.Empty:
+                    break
+            
+            # One append per session, keeping message order
+            by_session: Dict[str, List[Tuple[str, str, Optional[Dict]]]] = {}
+            for session_id, messages in batch:
+                by_session.setdefault(session_id, []).extend(messages)
+            
+            for session_id, messages in by_session.items():
+                self._write_messages(session_id, messages)
+            
+            for _ in batch:
+                task_done()
+    
+    def _write_messages(self, session_id: str, messages: List[Tuple[str, str, Optional[Dict]]]) -> None:
+        """Write messages to DynamoDB, backing off exponentially between failed attempts"""
+        for attempt in range(WRITE_MAX_ATTEMPTS):
+            try:
+                if self.db_client.add_messages(session_id, messages):
+                    return
+            except Exception as e:
+                logger.error(f"Failed to add messages to session {session_id}: {e}")
+            if attempt + 1 < WRITE_MAX_ATTEMPTS:
+                time.sleep(0.5 * 2 ** attempt)
+        
+        logger.error(f"Giving up on {len(messages)} message(s) for session {session_id}")
+    
     def get_chat_history(self, session_id: str, limit: Optional[int] = None) -> List[Dict]:
         """Get chat history for a session"""
         try:
             limit = limit or settings.max_chat_history
+            self.flush()
             return self.db_client.get_chat_history(session_id, limit) or []
         except Exception as e:
             logger.error(f"Failed to get chat history for session {session_id}: {e}")
@@ -76,36 +438,39 @@ class SEMPChatSessionManager:
     
     def process_user_message(self, session_id: str, user_message: str) -> str:
         """Process a user message and generate a response"""
+        # The user message and the reply are written together once the reply is ready
+        pending_messages = [("user", user_message, None)]
+        
         try:
-            # Add user message to session
-            self.add_message(session_id, "user", user_message)
-            
-            # Get chat history for context
-            chat_history = self.get_chat_history(session_id, limit=10)
+            # Determine the type of request (from the message alone)
+            request_type = self._classify_user_request(user_message)
+            retrieve = self._should_retrieve(user_message)
             
-            # Determine the type of request
-            request_type = self._classify_user_request(user_message, chat_history)
+            # Questions and results queries need the session's analysis record; the handlers
+            # answer from the message alone, so no chat history is read
+            analysis_info = None
+            if retrieve and request_type in ("ask_question", "view_results"):
+                analysis_info = self._get_session_analysis(session_id)
             
             # Process based on request type
             if request_type == "analyze_document":
-                response = self._handle_document_analysis(session_id, user_message, chat_history)
+                response = self._handle_document_analysis(session_id, user_message)
             elif request_type == "ask_question":
-                response = self._handle_question(session_id, user_message, chat_history)
+                response = self._handle_question(session_id, user_message, analysis_info)
             elif request_type == "view_results":
-                response = self._handle_results_query(session_id, user_message, chat_history)
+                response = self._handle_results_query(session_id, user_message, analysis_info)
             else:
-                response = self._handle_general_conversation(session_id, user_message, chat_history)
-            
-            # Add assistant response to session
-            self.add_message(session_id, "assistant", response)
-            
-            return response
+                response = self._handle_general_conversation(session_id, user_message)
             
         except Exception as e:
             logger.error(f"Failed to process user message in session {session_id}: {e}")
-            error_response = "I apologize, but I encountered an error processing your request. Please try again."
-            self.add_message(session_id, "assistant", error_response)
-            return error_response
+            response = "I apologize, but I encountered an error processing your request. Please try again."
+        
+        # Add user message and assistant response to session
+        pending_messages.append(("assistant", response, None))
+        self.add_messages(session_id, pending_messages)
+        
+        return response
     
     def analyze_document(
         self, 
@@ -116,8 +481,17 @@ class SEMPChatSessionManager:
     ) -> AnalysisResult:
         """Analyze a SEMP document and store results in session"""
         try:
-            # Create analysis request
-            options = analysis_options or {}
+            # Reject oversize documents before any copies of the text are made
+            if len(document_content) > settings.max_document_chars:
+                raise ValueError(
+                    f"Document {document_name} is too large to analyze "
+                    f"({len(document_content)} characters, limit {settings.max_document_chars})"
+                )
+            
+            # Create analysis request, tagged with the content hash
+            content_sha256 = _content_digest(document_content)
+            options = dict(analysis_options or {})
+            options["metadata"] = {**options.get("metadata", {}), "content_sha256": content_sha256}
             request = AnalysisRequest(
                 document_content=document_content,
                 document_name=document_name,
@@ -125,20 +499,34 @@ class SEMPChatSessionManager:
                 **options
             )
             
-            # Perform analysis
-            result = self.analyzer.analyze_document(request)
+            # Full results are archived in S3 under a key for the content, options and model,
+            # so re-analyzing an identical document reuses the earlier result
+            analysis_key = self._analysis_key(content_sha256, request)
+            archive_key = f"{settings.s3_analysis_prefix}{analysis_key}.json.gz"
             
-            # Store analysis result in session context
-            session_info = self.db_client.get_session_info(session_id)
+            # Look up the session while the analysis runs
+            session_future = self._db_executor.submit(self.db_client.get_session_info, session_id)
+            
+            # Perform analysis, unless this document was analyzed before
+            result = self._load_analysis(analysis_key, archive_key)
+            if result is None:
+                result = self.analyzer.analyze_document(request)
+                if result.summary.get("failed_sections") or result.summary.get("ungrounded_sections"):
+                    # Incomplete results are archived for this session only, never reused
+                    logger.warning(f"Not reusing incomplete analysis of {document_name}")
+                    archive_key = f"{settings.s3_analysis_prefix}{result.document_id}.json.gz"
+                else:
+                    self._result_cache.put(analysis_key, result)
+                self._db_executor.submit(self._archive_analysis, archive_key, result)
+            elif result.document_name != document_name:
+                result = result.model_copy(update={"document_name": document_name})
+            
+            # Store analysis result in session context; the session only stores what chat turns read
+            session_info = session_future.result()
             if session_info:
-                # Update session with current analysis
-                self.db_client.store_agent_info(
-                    f"session_analysis_{session_id}",
-                    {
-                        "current_document": document_name,
-                        "last_analysis": result.dict(),
-                        "analysis_timestamp": result.analysis_timestamp.isoformat()
-                    }
+                self._store_session_analysis(
+                    session_id, document_name, self._compact_analysis(result),
+                    result.analysis_timestamp.isoformat(), archive_key
                 )
             
             # Add analysis summary message to chat
@@ -156,19 +544,153 @@ class SEMPChatSessionManager:
             logger.error(f"Failed to analyze document in session {session_id}: {e}")
             raise
     
+    @staticmethod
+    def _analysis_key(content_sha256: str, request: AnalysisRequest) -> str:
+        """Key an analysis by document content, analysis options, model and result format"""
+        options = request.model_dump_json(exclude={"document_content", "document_name", "session_id", "metadata"})
+        return hashlib.sha256(
+            "|".join((content_sha256, options, settings.bedrock_model_id, ANALYSIS_RESULT_VERSION)).encode('utf-8')
+        ).hexdigest()
+    
+    def _load_analysis(self, analysis_key: str, archive_key: str) -> Optional[AnalysisResult]:
+        """Get a recent earlier result for the same analysis, from this process or the S3 archive"""
+        result = self._result_cache.get(analysis_key)
+        if result is not None:
+            return result if self._is_reusable(result) else None
+        
+        try:
+            from src.infrastructure.s3_client import S3KnowledgeBaseClient
+            
+            data = S3KnowledgeBaseClient.instance().download_document(archive_key)
+            if data is None:
+                return None
+            
+            result = AnalysisResult.model_validate_json(gzip.decompress(data))
+            if not self._is_reusable(result):
+                logger.info(f"Archived analysis {archive_key} has expired; re-analyzing")
+                return None
+            self._result_cache.put(analysis_key, result)
+            logger.info("Reusing archived analysis {} for {}", archive_key, result.document_name)
+            return result
+            
+        except Exception as e:
+            logger.warning(f"Failed to load archived analysis {archive_key}: {e}")
+            return None
+    
+    @staticmethod
+    def _is_reusable(result: AnalysisResult) -> bool:
+        """Whether an earlier result is recent enough to serve instead of re-analyzing"""
+        timestamp = result.analysis_timestamp
+        age = (datetime.now(timestamp.tzinfo) - timestamp).total_seconds()
+        return age <= settings.analysis_reuse_max_age
+    
+    def store_analysis(self, session_id: str, analysis: Dict[str, Any]) -> bool:
+        """Attach an analysis produced outside the session (as a JSON-mode dict) for chat turns"""
+        compact = {field: analysis.get(field) for field in ANALYSIS_RECORD_FIELDS}
+        compact["issues"] = [
+            {field: value for field, value in issue.items() if field in CHAT_ISSUE_FIELDS}
+            for issue in analysis.get("issues", [])
+        ]
+        return self._store_session_analysis(
+            session_id, analysis.get("document_name", "unknown"), compact,
+            str(analysis.get("analysis_timestamp", ""))
+        )
+    
+    def _store_session_analysis(
+        self,
+        session_id: str,
+        document_name: str,
+        analysis: Dict[str, Any],
+        analysis_timestamp: str,
+        archive_key: Optional[str] = None
+    ) -> bool:
+        """Store the session's analysis record, with the analysis as one gzipped JSON blob"""
+        record = {
+            "current_document": document_name,
+            "last_analysis_blob": self._encode_analysis(analysis),
+            "analysis_timestamp": analysis_timestamp
+        }
+        if archive_key:
+            record["analysis_archive_key"] = archive_key
+        return self.db_client.store_agent_info(f"session_analysis_{session_id}", record)
+    
+    @staticmethod
+    def _compact_analysis(result: AnalysisResult) -> Dict[str, Any]:
+        """Project an analysis result onto the fields chat handlers use"""
+        return {
+            "document_name": result.document_name,
+            "document_id": result.document_id,
+            "total_issues": result.total_issues,
+            "summary": result.summary,
+            "severity_distribution": result.severity_distribution,
+            "debt_type_distribution": result.debt_type_distribution,
+            "issues": [issue.model_dump(mode="json", include=CHAT_ISSUE_FIELDS) for issue in result.issues],
+            "issue_indices_by_severity": SEMPChatSessionManager._index_by_severity(result.issues)
+        }
+    
+    @staticmethod
+    def _encode_analysis(analysis: Dict[str, Any]) -> bytes:
+        """Serialize a session analysis to gzipped JSON, stored as one binary attribute"""
+        if orjson is not None:
+            data = orjson.dumps(analysis, default=str)
+        else:
+            data = json.dumps(analysis, default=str).encode('utf-8')
+        return gzip.compress(data)
+    
+    def _get_session_analysis(self, session_id: str) -> Optional[Dict]:
+        """Get the session's analysis record, with last_analysis decoded from its stored blob"""
+        analysis_info = self.db_client.get_agent_info(f"session_analysis_{session_id}")
+        blob = analysis_info.get("last_analysis_blob") if analysis_info else None
+        if blob is None:
+            # Records written as a plain map (before analyses were stored as blobs) are used as-is
+            return analysis_info
+        
+        # Decode each stored version once; a new store changes updated_at
+        cache_key = (session_id, analysis_info.get("updated_at"))
+        analysis = self._analysis_cache.get(cache_key)
+        if analysis is None:
+            data = gzip.decompress(getattr(blob, "value", blob))
+            analysis = orjson.loads(data) if orjson is not None else json.loads(data)
+            self._analysis_cache.put(cache_key, analysis)
+        
+        return {**analysis_info, "last_analysis": analysis}
+    
+    @staticmethod
+    def _index_by_severity(issues: List[DebtIssue]) -> Dict[str, List[int]]:
+        """Bucket issue positions by severity, so severity views don't rescan the issues"""
+        buckets: Dict[str, List[int]] = {}
+        for idx, issue in enumerate(issues):
+            buckets.setdefault(issue.severity.value, []).append(idx)
+        return buckets
+    
+    @staticmethod
+    def _archive_analysis(key: str, result: AnalysisResult) -> None:
+        """Store the full analysis result (with locations, context and metadata) as gzipped JSON"""
+        try:
+            from src.infrastructure.s3_client import S3KnowledgeBaseClient
+            
+            S3KnowledgeBaseClient.instance().upload_document(
+                key, gzip.compress(result.model_dump_json().encode('utf-8')), {"content-encoding": "gzip"}
+            )
+        except Exception as e:
+            logger.error(f"Failed to archive analysis {result.document_id}: {e}")
+    
     def get_session_context(self, session_id: str) -> Dict[str, Any]:
         """Get current session context and state"""
         try:
-            # Get session info
+            # Get session info and analysis info (if available) concurrently; queued
+            # messages are written first so the session's message count includes them
+            self.flush()
+            analysis_future = self._db_executor.submit(
+                self._get_session_analysis, session_id
+            )
             session_info = self.db_client.get_session_info(session_id)
-            
-            # Get analysis info if available
-            analysis_info = self.db_client.get_agent_info(f"session_analysis_{session_id}")
+            message_count = session_info['message_count'] if session_info else 0
             
             context = {
                 "session_info": session_info,
-                "current_analysis": analysis_info,
-                "chat_history_length": len(self.get_chat_history(session_id))
+                "current_analysis": analysis_future.result(),
+                "chat_history_length": min(message_count, settings.max_chat_history)
             }
             
             return context
@@ -177,95 +699,46 @@ class SEMPChatSessionManager:
             logger.error(f"Failed to get session context for {session_id}: {e}")
             return {}
     
-    def _classify_user_request(self, message: str, chat_history: List[Dict]) -> str:
+    def _classify_user_request(self, message: str) -> str:
         """Classify the type of user request"""
-        message_lower = message.lower()
-        
-        # Check for explicit document analysis requests (must contain action + document reference)
-        analysis_patterns = [
-            "analyze this document", "analyze my semp", "check this document", "review this semp",
-            "analyze document", "process this semp", "upload document", "upload file",
-            "analyze the document", "check my semp", "review document"
-        ]
-        if any(phrase in message_lower for phrase in analysis_patterns):
-            return "analyze_document"
-        
-        # Check for results/findings queries (asking about existing analysis)
-        results_patterns = [
-            "show results", "view findings", "analysis results", "show issues", 
-            "view results", "display results", "last analysis", "previous analysis",
-            "show summary", "analysis summary", "show findings", "latest results"
-        ]
-        if any(phrase in message_lower for phrase in results_patterns):
-            return "view_results"
-        
-        # Prioritize general questions (educational/conceptual queries)
-        question_patterns = [
-            "what is", "what are", "how does", "how do", "explain", "define", 
-            "tell me about", "describe", "why", "when", "where", "help me understand",
-            "best practices", "methodology", "standard", "approach", "difference between",
-            "advantages of", "disadvantages of", "benefits of", "challenges of"
-        ]
-        if any(pattern in message_lower for pattern in question_patterns):
-            return "ask_question"
-        
-        # If message contains SE/requirements terms without action words, treat as question
-        se_terms = [
-            'requirements debt', 'technical debt', 'requirements engineering',
-            'systems engineering', 'verification', 'validation', 'traceability', 
-            'requirements management', 'semp standards', 'semp best practices'
-        ]
-        
-        action_words = [
-            'analyze', 'upload', 'process', 'check', 'review', 'show', 'view', 'display'
-        ]
+        # Document analysis requests take precedence over results queries
+        request_type = "ask_question"
+        for match in REQUEST_CLASSIFIER_PATTERN.finditer(message):
+            if match.lastgroup == "analyze_document":
+                return "analyze_document"
+            request_type = match.lastgroup
         
-        if (any(term in message_lower for term in se_terms) and 
-            not any(action in message_lower for action in action_words)):
-            return "ask_question"
-        
-        # Default to general question for everything else (be more inclusive)
-        return "ask_question"
+        # Everything else (conceptual, SE-term and general queries) is answered as a question
+        return request_type
     
-    def _handle_document_analysis(self, session_id: str, message: str, chat_history: List[Dict]) -> str:
+    def _handle_document_analysis(self, session_id: str, message: str) -> str:
         """Handle document analysis requests"""
-        return """I'm ready to analyze your SEMP document for requirements debt. Please provide the document content in one of these ways:
-
-1. **Paste the text directly** into the chat
-2. **Upload a file** (if using the file upload feature)
-3. **Provide a document URL** or S3 key if it's already in the knowledge base
-
-Once you provide the document, I'll analyze it for potential requirements debt issues including:
-- Ambiguity and vague terminology
-- Incompleteness and missing constraints  
-- Inconsistency and conflicting requirements
-- Traceability gaps
-- Unclear acceptance criteria
-- Untestable requirements
-
-The analysis will include specific locations, problem descriptions, recommended fixes, and references to best practices from my knowledge base."""
+        return DOCUMENT_ANALYSIS_RESPONSE
     
-    def _handle_question(self, session_id: str, message: str, chat_history: List[Dict]) -> str:
-        """Handle general questions about requirements engineering"""
+    def _handle_question(
+        self, session_id: str, message: str, analysis_info: Optional[Dict]
+    ) -> str:
+        """Handle general questions about requirements engineering, given the session's analysis record"""
+        # Skip session lookups and the embedding + vector search for greetings
+        if not self._should_retrieve(message):
+            return self._handle_general_conversation(session_id, message)
+        
         try:
-            # First check if we have analysis context for this session
-            analysis_info = self.db_client.get_agent_info(f"session_analysis_{session_id}")
-            
             # If we have analysis context and the question seems related to specific issues
             if analysis_info and self._is_analysis_specific_question(message):
                 return self._handle_analysis_specific_question(message, analysis_info, session_id)
             
             # Search knowledge base for relevant information
-            search_results = self.knowledge_base.search_knowledge_base(
+            search_results = self.knowledge_base.search_hybrid(
                 message, top_k=5, score_threshold=0.3
             )
             
+            # Drop near-duplicate passages (overlapping chunks, repeated boilerplate)
+            search_results = self._dedupe_passages(search_results)
+            
             if search_results:
-                # Prepare context from search results
-                context = "\n".join([
-                    f"From {result['document']}: {result['text'][:300]}..."
-                    for result in search_results
-                ])
+                # Prepare context from search results, within the context budget
+                context = self._build_question_context(search_results)
                 
                 # Generate response using the knowledge base context
                 response = f"""Based on systems engineering best practices and standards:
@@ -286,24 +759,44 @@ Would you like me to elaborate on any specific aspect or analyze a SEMP document
             logger.error(f"Failed to handle question: {e}")
             return "I encountered an error processing your question. Please try rephrasing it or ask about a specific SEMP analysis topic."
     
+    @staticmethod
+    def _dedupe_passages(results: List[Dict], threshold: float = PASSAGE_DUPLICATE_JACCARD) -> List[Dict]:
+        """Drop passages whose word sets overlap a higher-scored passage at or above threshold"""
+        kept = []
+        kept_words = []
+        for result in sorted(results, key=lambda r: r['score'], reverse=True):
+            words = set(result['text'].lower().split())
+            if any(len(words & other) >= threshold * len(words | other) for other in kept_words):
+                continue
+            kept.append(result)
+            kept_words.append(words)
+        return kept
+    
+    @staticmethod
+    def _build_question_context(results: List[Dict], char_budget: int = QUESTION_CONTEXT_CHARS) -> str:
+        """Join passage excerpts into question context, stopping at the character budget"""
+        excerpts = []
+        used = 0
+        for result in results:
+            excerpt = f"From {result['document']}: {result['text'][:300]}..."
+            if excerpts and used + len(excerpt) > char_budget:
+                break
+            excerpts.append(excerpt)
+            used += len(excerpt) + 1
+        return "\n".join(excerpts)
+    
+    @staticmethod
+    def _should_retrieve(message: str) -> bool:
+        """Check whether a message has enough signal to be worth a knowledge base search"""
+        return not LOW_SIGNAL_MESSAGE_PATTERN.match(message)
+    
     def _is_analysis_specific_question(self, message: str) -> bool:
         """Check if the question is about specific analysis results"""
-        analysis_indicators = [
-            'this issue', 'this problem', 'this debt', 'this requirement',
-            'vague terminology', 'ambiguity', 'incompleteness', 'inconsistency',
-            'traceability gap', 'unclear acceptance', 'untestable', 'conflicting',
-            'reliability', 'measurable terms', 'verify compliance', 'problematic',
-            'should it be addressed', 'how should', 'what makes this',
-            'why is this', 'how to fix', 'recommended fix',
-            'ambiguity issue', 'requirements management process', 'change control',
-            'lack of a clear', 'lack of a defined', 'does not describe',
-            'explain more about', 'tell me about', 'what is problematic'
-        ]
+        # Quoted text indicates reference to a specific issue
+        if QUOTED_TEXT_PATTERN.search(message):
+            return True
         
-        # Also check for quoted text (indicates reference to specific issue)
-        has_quotes = '"' in message and message.count('"') >= 2
-        
-        return any(indicator in message.lower() for indicator in analysis_indicators) or has_quotes
+        return ANALYSIS_INDICATOR_PATTERN.search(message) is not None
     
     def _handle_analysis_specific_question(self, message: str, analysis_info: Dict, session_id: str) -> str:
         """Handle questions about specific analysis issues"""
@@ -315,55 +808,41 @@ Would you like me to elaborate on any specific aspect or analyze a SEMP document
                 return "I don't have any specific issues to reference from the recent analysis."
             
             # Try to find the specific issue being asked about
-            relevant_issues = []
             message_lower = message.lower()
+            message_words = frozenset(WORD_PATTERN.findall(message_lower))
             
             # Extract quoted text if present
-            quoted_text = ""
-            if '"' in message:
-                import re
-                quotes = re.findall(r'"([^"]+)"', message)
-                if quotes:
-                    quoted_text = quotes[0].lower()
+            quote = QUOTED_TEXT_PATTERN.search(message)
+            quoted_text = quote.group(1).lower() if quote else ""
             
+            best_issue = None
+            best_score = 0
             for issue in issues:
                 issue_type = issue.get('debt_type', '').lower()
                 problem_desc = issue.get('problem_description', '').lower()
-                location = issue.get('location_in_text', '').lower()
-                
-                # Calculate relevance score
-                relevance_score = 0
                 
                 # High relevance: exact issue type match
-                if issue_type in message_lower:
-                    relevance_score += 10
+                relevance_score = 10 if issue_type and issue_type in message_lower else 0
                 
                 # Medium relevance: quoted text matches problem description
                 if quoted_text and quoted_text in problem_desc:
                     relevance_score += 8
-                    
+                
                 # Medium relevance: key words from issue type
-                for word in issue_type.split():
-                    if len(word) > 3 and word in message_lower:
-                        relevance_score += 3
+                type_words = {word for word in WORD_PATTERN.findall(issue_type) if len(word) > 3}
+                relevance_score += 3 * len(type_words & message_words)
                 
-                # Low relevance: key words from problem description  
-                for word in problem_desc.split()[:10]:  # First 10 words are most important
-                    if len(word) > 4 and word in message_lower:
-                        relevance_score += 1
+                # Low relevance: key words from the first 10 words of the problem description
+                head_words = {word for word in WORD_PATTERN.findall(problem_desc)[:10] if len(word) > 4}
+                relevance_score += len(head_words & message_words)
                 
-                # Add issue if it has any relevance
-                if relevance_score > 0:
-                    issue['_relevance_score'] = relevance_score
-                    relevant_issues.append(issue)
-            
-            # Sort by relevance score
-            relevant_issues.sort(key=lambda x: x.get('_relevance_score', 0), reverse=True)
+                # Keep the first issue with the highest relevance
+                if relevance_score > best_score:
+                    best_issue, best_score = issue, relevance_score
             
-            if relevant_issues:
+            if best_issue is not None:
                 # Focus on the most relevant issue
-                issue = relevant_issues[0]
-                return self._explain_specific_issue(issue, message)
+                return self._explain_specific_issue(best_issue, message)
             else:
                 # If no specific issue found, provide general guidance
                 return self._provide_general_analysis_guidance(message, analysis_data)
@@ -383,9 +862,7 @@ Would you like me to elaborate on any specific aspect or analyze a SEMP document
             confidence = issue.get('confidence', 0)
             reference = issue.get('reference', '')
             
-            # Create a contextual prompt for the AI
-            system_prompt = """You are an expert Requirements Engineering consultant. Provide clear, educational explanations about requirements debt issues. Be conversational, helpful, and focus on practical guidance that helps the user understand both the problem and the solution."""
-            
+            # Only the issue and the question vary; the instructions live in the system prompt
             user_prompt = f"""I found this {issue_type} issue in a SEMP document analysis:
 
 Problem: {problem}
@@ -396,24 +873,12 @@ Recommended Fix: {fix}
 
 Severity: {severity} | Confidence: {confidence*100:.0f}%
 
-The user asked: "{original_question}"
-
-Please provide a comprehensive, conversational explanation that addresses:
-1. What makes this specific issue problematic in systems engineering
-2. Why this type of requirements debt matters
-3. How to implement the recommended fix practically
-4. What could happen if this isn't addressed
-5. Any additional insights or best practices
-
-Be specific to this exact issue, not generic. Make it educational and actionable."""
+The user asked: "{original_question}\""""
             
             # Generate AI response using Bedrock
-            from src.infrastructure.bedrock_client import BedrockClient
-            bedrock_client = BedrockClient()
-            
-            ai_response = bedrock_client.generate_text(
+            ai_response = self.bedrock_client.generate_text(
                 prompt=user_prompt,
-                system_prompt=system_prompt,
+                system_prompt=SYSTEM_PROMPT_ISSUE_EXPLAINER,
                 max_tokens=1200,
                 temperature=0.3
             )
@@ -450,30 +915,16 @@ I encountered an error generating a detailed explanation. Please try asking your
 Severity: {', '.join([f'{k}: {v}' for k, v in severity_dist.items() if v > 0])}
 Debt Types: {', '.join([f'{k}: {v}' for k, v in debt_types.items() if v > 0])}"""
             
-            system_prompt = """You are an expert Requirements Engineering consultant. Provide actionable guidance about requirements debt analysis results. Be conversational, helpful, and focus on practical next steps."""
-            
             user_prompt = f"""I just completed a SEMP requirements debt analysis:
 
 {analysis_summary}
 
-The user asked: "{message}"
-
-Please provide helpful guidance that:
-1. Interprets what these results mean
-2. Suggests practical next steps prioritized by impact
-3. Explains why certain types of issues matter more
-4. Offers specific advice for improving the SEMP document
-5. Answers the user's question in this context
-
-Be specific to these results, not generic. Make it actionable and educational."""
+The user asked: "{message}\""""
             
             # Generate AI response using Bedrock
-            from src.infrastructure.bedrock_client import BedrockClient
-            bedrock_client = BedrockClient()
-            
-            response = bedrock_client.generate_text(
+            response = self.bedrock_client.generate_text(
                 prompt=user_prompt,
-                system_prompt=system_prompt,
+                system_prompt=SYSTEM_PROMPT_ANALYSIS_GUIDANCE,
                 max_tokens=800,
                 temperature=0.3
             )
@@ -486,64 +937,13 @@ Be specific to these results, not generic. Make it actionable and educational.""
             total_issues = analysis_data.get('total_issues', 0)
             return f"Based on your analysis that found {total_issues} issues, I'd recommend focusing on the highest severity items first. Would you like me to explain a specific issue or concept in more detail?"
     
-    def _provide_general_answer(self, message: str) -> str:
-        """Provide general answers for common requirements engineering questions"""
-        message_lower = message.lower()
-        
-        if 'requirements debt' in message_lower:
-            return """Requirements debt refers to the accumulation of shortcuts, compromises, or deficiencies in requirements engineering that create future costs and risks. Common types include:
-
-• **Technical Debt**: Poor requirements documentation or processes
-• **Ambiguity Debt**: Vague or unclear requirements language
-• **Completeness Debt**: Missing or incomplete requirements
-• **Consistency Debt**: Conflicting or contradictory requirements
-• **Traceability Debt**: Poor links between requirements and other artifacts
-
-Addressing requirements debt early reduces project risk and long-term costs."""
-        
-        elif 'vague terminology' in message_lower or 'ambiguity' in message_lower:
-            return """Vague terminology in requirements is problematic because:
-
-• **Subjectivity**: Terms like "reliable," "fast," or "user-friendly" mean different things to different people
-• **Untestable**: You can't verify requirements that aren't measurably defined
-• **Implementation Risk**: Developers must make assumptions, leading to mismatched expectations
-• **Compliance Issues**: Auditors cannot objectively assess compliance
-
-**Solutions:**
-• Replace subjective terms with quantitative metrics
-• Define acceptance criteria with measurable thresholds
-• Use standard terminology and units
-• Include examples and boundary conditions"""
-        
-        elif 'semp' in message_lower or 'systems engineering' in message_lower:
-            return """A Systems Engineering Management Plan (SEMP) defines how systems engineering activities will be conducted throughout a project lifecycle. Key components include:
-
-• **Technical processes**: Requirements analysis, design, verification, validation
-• **Management processes**: Planning, risk management, configuration control
-• **Organizational structure**: Roles, responsibilities, and reporting relationships
-• **Tools and methodologies**: Standards, procedures, and supporting tools
-• **Lifecycle management**: Phase gates, reviews, and decision points
-
-A well-written SEMP provides clear, measurable guidance for all stakeholders."""
-        
-        else:
-            return """I specialize in requirements engineering and SEMP analysis. I can help with:
-
-• **Requirements Debt Analysis**: Identifying and fixing quality issues
-• **SEMP Document Review**: Analyzing management plans for completeness
-• **Best Practices**: Guidance on systems engineering standards
-• **Problem Resolution**: Specific advice on requirements challenges
-
-What specific aspect of requirements engineering would you like to explore?"""
-    
-    def _handle_results_query(self, session_id: str, message: str, chat_history: List[Dict]) -> str:
-        """Handle queries about analysis results"""
+    def _handle_results_query(
+        self, session_id: str, message: str, analysis_info: Optional[Dict]
+    ) -> str:
+        """Handle queries about analysis results, given the session's analysis record"""
         try:
-            # Get current analysis from session
-            analysis_info = self.db_client.get_agent_info(f"session_analysis_{session_id}")
-            
             if not analysis_info or "last_analysis" not in analysis_info:
-                return "I don't have any recent analysis results to show. Please analyze a SEMP document first by providing the document content."
+                return NO_ANALYSIS_RESULTS_RESPONSE
             
             # Check if this is a specific issue question rather than general results request
             if self._is_analysis_specific_question(message):
@@ -553,11 +953,13 @@ What specific aspect of requirements engineering would you like to explore?"""
             analysis_data = analysis_info["last_analysis"]
             
             # Create a formatted response based on what user is asking
-            if "summary" in message.lower():
+            requested_views = {match.lastgroup for match in RESULTS_VIEW_PATTERN.finditer(message)}
+            view = next((name for name in RESULTS_VIEW_PRECEDENCE if name in requested_views), None)
+            if view == "summary":
                 return self._format_analysis_summary(analysis_data)
-            elif "table" in message.lower() or "format" in message.lower():
+            elif view == "table":
                 return self._format_analysis_table(analysis_data)
-            elif "high" in message.lower() or "critical" in message.lower():
+            elif view == "high_severity":
                 return self._format_high_severity_issues(analysis_data)
             else:
                 return self._format_general_results(analysis_data)
@@ -566,54 +968,39 @@ What specific aspect of requirements engineering would you like to explore?"""
             logger.error(f"Failed to handle results query: {e}")
             return "I encountered an error retrieving the analysis results. Please try your request again."
     
-    def _handle_general_conversation(self, session_id: str, message: str, chat_history: List[Dict]) -> str:
+    def _handle_general_conversation(self, session_id: str, message: str) -> str:
         """Handle general conversation"""
         # If it seems like a question, try to provide a useful answer
-        if any(word in message.lower() for word in ['?', 'what', 'how', 'why', 'when', 'where']):
+        if QUESTION_MARKER_PATTERN.search(message):
             return self._provide_general_answer(message)
         
         # Otherwise provide the standard welcome/help message
-        return """I'm specialized in analyzing Systems Engineering Management Plans (SEMPs) for requirements debt. I can help you with:
-
-🔍 **Document Analysis**: Identify debt issues like ambiguity, incompleteness, and inconsistencies
-📊 **Results Review**: View analysis findings in structured tables with recommendations  
-❓ **Q&A**: Answer questions about requirements engineering best practices
-📚 **Knowledge Base**: Reference authoritative sources and standards
-
-How would you like to proceed? You can:
-- Share a SEMP document for analysis
-- Ask about specific requirements engineering topics
-- Request help with understanding requirements debt types"""
+        return GENERAL_CONVERSATION_RESPONSE
     
     def _create_analysis_summary_message(self, result: AnalysisResult) -> str:
         """Create a summary message for analysis results"""
         summary = result.summary
         
-        message = f"""## Analysis Complete: {result.document_name}
-
-**Summary:**
-- **Total Issues Found:** {result.total_issues}
-- **High/Critical Issues:** {summary.get('high_severity_issues', 0)}
-- **Analysis Duration:** {result.analysis_duration:.2f} seconds
-- **Average Confidence:** {summary.get('average_confidence', 0.0):.2f}
-
-**Issue Distribution:**
-"""
-        
-        # Add severity distribution
-        for severity, count in result.severity_distribution.items():
-            if count > 0:
-                message += f"- **{severity}:** {count} issues\n"
-        
-        message += f"""
-**Most Common Debt Type:** {summary.get('most_common_debt_type', 'N/A')}
-
-Would you like to see the detailed results in a table format or focus on specific types of issues?"""
-        
-        return message
+        return ANALYSIS_COMPLETE_TEMPLATE.format_map({
+            "document_name": result.document_name,
+            "total_issues": result.total_issues,
+            "high_severity_issues": summary.get('high_severity_issues', 0),
+            "analysis_duration": result.analysis_duration,
+            "average_confidence": summary.get('average_confidence', 0.0),
+            "severity_lines": _count_lines(result.severity_distribution),
+            "most_common_debt_type": summary.get('most_common_debt_type', 'N/A')
+        })
     
     def _generate_contextual_response(self, question: str, context: str) -> str:
         """Generate a response using knowledge base context and Bedrock"""
+        cache_key = (
+            _question_digest(question),
+            hashlib.blake2b(context.encode('utf-8'), digest_size=16).digest()
+        )
+        cached = self._response_cache.get(cache_key)
+        if cached is not None:
+            return cached
+        
         try:
             # Create a prompt for Bedrock to generate a comprehensive answer
             system_prompt = "You are an expert in Requirements Engineering and Systems Engineering. Answer questions clearly and concisely based on the provided context from authoritative sources."
@@ -626,16 +1013,14 @@ Context from authoritative systems engineering documents:
 Please provide a clear, comprehensive answer to the question based on the context provided. Focus on practical guidance and best practices."""
             
             # Generate response using Bedrock
-            from src.infrastructure.bedrock_client import BedrockClient
-            bedrock_client = BedrockClient()
-            
-            response = bedrock_client.generate_text(
+            response = self.bedrock_client.generate_text(
                 prompt=user_prompt,
                 system_prompt=system_prompt,
                 max_tokens=1000,
                 temperature=0.3
             )
             
+            self._response_cache.put(cache_key, response)
             return response
             
         except Exception as e:
@@ -650,105 +1035,84 @@ Please provide a clear, comprehensive answer to the question based on the contex
         if not issues:
             return "No issues were found in the analysis."
         
-        table = """## Requirements Debt Analysis Results
-
-| Location in Text | Debt Type / Problem | Recommended Fix | Reference | Severity |
-|-----------------|-------------------|-----------------|-----------|----------|
-"""
-        
-        for issue in issues[:10]:  # Limit to first 10 issues
-            location = issue.get("location_in_text", "")[:50] + "..." if len(issue.get("location_in_text", "")) > 50 else issue.get("location_in_text", "")
-            debt_type = issue.get("debt_type", "")
-            problem = issue.get("problem_description", "")[:100] + "..." if len(issue.get("problem_description", "")) > 100 else issue.get("problem_description", "")
-            fix = issue.get("recommended_fix", "")[:100] + "..." if len(issue.get("recommended_fix", "")) > 100 else issue.get("recommended_fix", "")
-            reference = issue.get("reference", "")[:50] + "..." if len(issue.get("reference", "")) > 50 else issue.get("reference", "")
-            severity = issue.get("severity", "")
-            
-            table += f"| {location} | {debt_type}: {problem} | {fix} | {reference} | {severity} |\n"
-        
-        if len(issues) > 10:
-            table += f"\n*Showing first 10 of {len(issues)} total issues*"
+        rows = "".join(
+            f"| {_ellipsize(issue.get('location_in_text', ''), 50)} "
+            f"| {issue.get('debt_type', '')}: {_ellipsize(issue.get('problem_description', ''), 100)} "
+            f"| {_ellipsize(issue.get('recommended_fix', ''), 100)} "
+            f"| {_ellipsize(issue.get('reference', ''), 50)} "
+            f"| {issue.get('severity', '')} |\n"
+            for issue in issues[:TABLE_MAX_ISSUES]
+        )
+        footer = (
+            f"\n*Showing first {TABLE_MAX_ISSUES} of {len(issues)} total issues*"
+            if len(issues) > TABLE_MAX_ISSUES else ""
+        )
         
-        return table
+        return "".join((ANALYSIS_TABLE_HEADER, rows, footer))
     
     def _format_analysis_summary(self, analysis_data: Dict) -> str:
         """Format a summary of analysis results"""
         summary = analysis_data.get("summary", {})
         
-        return f"""## Analysis Summary
-
-**Overall Results:**
-- Total Issues: {analysis_data.get('total_issues', 0)}
-- High/Critical Issues: {summary.get('high_severity_issues', 0)}
-- Sections Analyzed: {summary.get('sections_analyzed', 0)}
-- Average Confidence: {summary.get('average_confidence', 0.0):.2f}
-
-**Issue Breakdown:**
-- Most Common Issue: {summary.get('most_common_debt_type', 'N/A')}
-- Recommendations Provided: {summary.get('recommendations_provided', 0)}
-
-Would you like to see the detailed table or focus on specific severity levels?"""
+        return ANALYSIS_SUMMARY_TEMPLATE.format_map({
+            "total_issues": analysis_data.get('total_issues', 0),
+            "high_severity_issues": summary.get('high_severity_issues', 0),
+            "sections_analyzed": summary.get('sections_analyzed', 0),
+            "average_confidence": summary.get('average_confidence', 0.0),
+            "most_common_debt_type": summary.get('most_common_debt_type', 'N/A'),
+            "recommendations_provided": summary.get('recommendations_provided', 0)
+        })
     
     def _format_high_severity_issues(self, analysis_data: Dict) -> str:
         """Format high severity issues only"""
         issues = analysis_data.get("issues", [])
-        high_severity_issues = [
-            issue for issue in issues 
-            if issue.get("severity") in ["High", "Critical"]
-        ]
+        buckets = analysis_data.get("issue_indices_by_severity")
+        if buckets is not None:
+            # Severity buckets are stored with the analysis; keep the issues' original order
+            high_severity_issues = [
+                issues[int(idx)]
+                for idx in sorted(chain.from_iterable(buckets.get(level, ()) for level in HIGH_SEVERITY_LEVELS))
+            ]
+        else:
+            high_severity_issues = [
+                issue for issue in issues 
+                if issue.get("severity") in HIGH_SEVERITY_LEVELS
+            ]
         
         if not high_severity_issues:
             return "No high or critical severity issues were found in the analysis."
         
-        result = f"## High Priority Issues ({len(high_severity_issues)} found)\n\n"
+        header = f"## High Priority Issues ({len(high_severity_issues)} found)\n\n"
         
-        for i, issue in enumerate(high_severity_issues, 1):
-            result += f"""**Issue {i}: {issue.get('debt_type', 'Unknown')}** (Severity: {issue.get('severity', 'Unknown')})
+        return header + "".join(
+            f"""**Issue {i}: {issue.get('debt_type', 'Unknown')}** (Severity: {issue.get('severity', 'Unknown')})
 - **Location:** {issue.get('location_in_text', 'Not specified')}
 - **Problem:** {issue.get('problem_description', 'No description')}
 - **Recommended Fix:** {issue.get('recommended_fix', 'No recommendation')}
 - **Reference:** {issue.get('reference', 'No reference')}
 
 """
-        
-        return result
+            for i, issue in enumerate(high_severity_issues, 1)
+        )
     
     def _format_general_results(self, analysis_data: Dict) -> str:
         """Format general results overview"""
-        return f"""## Analysis Results Overview
-
-The analysis found **{analysis_data.get('total_issues', 0)} total issues** in the document.
-
-**Severity Breakdown:**
-"""
-        + "\n".join([
-            f"- **{severity}:** {count} issues" 
-            for severity, count in analysis_data.get('severity_distribution', {}).items()
-            if count > 0
-        ]) + """
+        return GENERAL_RESULTS_TEMPLATE.format_map({
+            "total_issues": analysis_data.get('total_issues', 0),
+            "severity_lines": _count_lines(analysis_data.get('severity_distribution', {})),
+            "debt_type_lines": _count_lines(analysis_data.get('debt_type_distribution', {}))
+        })
 
-**Debt Type Breakdown:**
-"""
-        + "\n".join([
-            f"- **{debt_type}:** {count} issues"
-            for debt_type, count in analysis_data.get('debt_type_distribution', {}).items()
-            if count > 0
-        ]) + """
-
-Would you like to see:
-1. Detailed table format
-2. Only high/critical issues  
-3. Issues of a specific type
-4. Analysis summary
-
-Just let me know what you'd prefer!"""
 
     def _provide_general_answer(self, question: str) -> str:
         """Provide a general answer using Bedrock for common SE concepts"""
+        # General answers don't depend on retrieved context, so the question alone is the key
+        cache_key = (_question_digest(question), None)
+        cached = self._response_cache.get(cache_key)
+        if cached is not None:
+            return cached
+        
         try:
-            from src.infrastructure.bedrock_client import BedrockClient
-            bedrock_client = BedrockClient()
-            
             system_prompt = """You are an expert in Requirements Engineering, Systems Engineering, and Requirements Debt analysis. 
             Provide clear, comprehensive answers about systems engineering concepts, best practices, and methodologies. 
             Focus on practical guidance that would be valuable for systems engineers and requirements analysts."""
@@ -763,14 +1127,16 @@ Just let me know what you'd prefer!"""
             
             Keep the response practical and actionable."""
             
-            response = bedrock_client.generate_text(
+            response = self.bedrock_client.generate_text(
                 prompt=user_prompt,
                 system_prompt=system_prompt,
                 max_tokens=800,
                 temperature=0.3
             )
             
-            return response + "\n\n💡 *Would you like me to help you apply these concepts to a specific SEMP document, or do you have any follow-up questions?*"
+            answer = response + "\n\n💡 *Would you like me to help you apply these concepts to a specific SEMP document, or do you have any follow-up questions?*"
+            self._response_cache.put(cache_key, answer)
+            return answer
             
         except Exception as e:
             logger.error(f"Failed to generate general answer: {e}")
@@ -787,6 +1153,7 @@ Just let me know what you'd prefer!"""
     def close_session(self, session_id: str) -> bool:
         """Close a chat session"""
         try:
+            self.flush()
             return self.db_client.update_session_status(session_id, "completed")
         except Exception as e:
             logger.error(f"Failed to close session {session_id}: {e}")
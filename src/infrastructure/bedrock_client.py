@@ -2,31 +2,75 @@
 AWS Bedrock client for LLM and embeddings
 """
 import json
-import boto3
+import threading
+import time
 import numpy as np
-from typing import List, Dict, Any
+from functools import cached_property, lru_cache
+from typing import Iterator, List, Dict, Any, Optional
 from loguru import logger
+from botocore.config import Config
 from botocore.exceptions import ClientError, NoCredentialsError
 
-from config.settings import get_aws_config, get_bedrock_config
+from config.settings import get_aws_session, get_bedrock_config, settings
+
+try:
+    import orjson
+except ImportError:  # Fall back to the stdlib codec when orjson is unavailable
+    orjson = None
+
+# Error codes Bedrock returns when requests exceed the account's quota
+THROTTLING_ERROR_CODES = frozenset({'ThrottlingException', 'ServiceQuotaExceededException', 'TooManyRequestsException'})
+
+# Batch inference job states after which the job no longer changes
+BATCH_JOB_FINAL_STATUSES = frozenset({'Completed', 'PartiallyCompleted', 'Failed', 'Stopped', 'Expired'})
+
+# Status reported for a batch inference job stopped because it didn't finish in time
+BATCH_JOB_TIMED_OUT = 'TimedOut'
+
+
+def _dumps(payload: Dict) -> bytes:
+    """Serialize a request body to JSON bytes"""
+    return orjson.dumps(payload) if orjson is not None else json.dumps(payload).encode('utf-8')
+
+
+def _loads(data: bytes) -> Any:
+    """Parse a JSON response body"""
+    return orjson.loads(data) if orjson is not None else json.loads(data)
+
+
+@lru_cache(maxsize=1)
+def _generation_slots() -> threading.BoundedSemaphore:
+    """Process-wide limit on in-flight text generation requests"""
+    return threading.BoundedSemaphore(max(1, settings.bedrock_max_concurrency))
 
 
 class BedrockClient:
     """Client for AWS Bedrock LLM and embeddings"""
     
+    @classmethod
+    @lru_cache(maxsize=1)
+    def instance(cls) -> "BedrockClient":
+        """Get a shared, lazily constructed instance for the current process"""
+        return cls()
+    
     def __init__(self):
         try:
-            aws_config = get_aws_config()
             bedrock_config = get_bedrock_config()
             
-            # Use bedrock region, overriding the aws_config region if different
-            client_config = aws_config.copy()
-            client_config["region_name"] = bedrock_config["region"]
-            
-            # Initialize Bedrock Runtime client
-            self.bedrock_runtime = boto3.client(
+            # Initialize Bedrock Runtime client from the shared session, overriding the
+            # session region with the Bedrock region; the connection pool is sized so every
+            # concurrent section analysis (plus its embedding calls) keeps a warm connection.
+            # Adaptive retries back off exponentially on throttling and transient errors and
+            # rate-limit the client with a token bucket once throttling is seen. TCP keepalive
+            # stops idle pooled connections from being dropped between chat turns
+            self.bedrock_runtime = get_aws_session().client(
                 'bedrock-runtime',
-                **client_config
+                region_name=bedrock_config["region"],
+                config=Config(
+                    retries={'max_attempts': settings.bedrock_max_attempts, 'mode': 'adaptive'},
+                    max_pool_connections=max(10, settings.bedrock_max_concurrency * 2),
+                    tcp_keepalive=True
+                )
             )
             
             self.model_id = bedrock_config["model_id"]
@@ -44,59 +88,162 @@ class BedrockClient:
     def generate_text(self, prompt: str, system_prompt: str = None, **kwargs) -> str:
         """Generate text using Bedrock LLM"""
         try:
-            # Default parameters for Claude
-            default_params = {
-                "max_tokens": kwargs.get("max_tokens", 4000),
-                "temperature": kwargs.get("temperature", 0.3),
-                "top_p": kwargs.get("top_p", 0.9),
-                "stop_sequences": kwargs.get("stop_sequences", [])
-            }
+            request_body = self.build_text_request(prompt, system_prompt, **kwargs)
             
-            # Build request body based on model type
-            if "anthropic.claude" in self.model_id.lower():
-                request_body = self._build_claude_request(prompt, system_prompt, default_params)
-            elif "amazon.titan" in self.model_id.lower():
-                request_body = self._build_titan_request(prompt, default_params)
-            else:
-                # Generic request format
-                request_body = {
-                    "inputText": prompt,
-                    "textGenerationConfig": default_params
-                }
-            
-            # Make request to Bedrock
-            response = self.bedrock_runtime.invoke_model(
-                modelId=self.model_id,
-                body=json.dumps(request_body)
-            )
-            
-            # Parse response
-            response_body = json.loads(response['body'].read())
+            # Make request to Bedrock, waiting for a free slot so concurrent analyses and
+            # chat sessions together stay within the account's request quota
+            with _generation_slots():
+                response = self.bedrock_runtime.invoke_model(
+                    modelId=self.model_id,
+                    body=_dumps(request_body)
+                )
+                
+                # Parse response
+                response_body = _loads(response['body'].read())
             
-            # Extract text based on model type
-            if "anthropic.claude" in self.model_id.lower():
-                return response_body['content'][0]['text']
-            elif "amazon.titan" in self.model_id.lower():
-                return response_body['results'][0]['outputText']
-            else:
-                # Try common response formats
-                if 'outputText' in response_body:
-                    return response_body['outputText']
-                elif 'content' in response_body:
-                    return response_body['content']
-                elif 'text' in response_body:
-                    return response_body['text']
-                else:
-                    logger.warning(f"Unknown response format: {response_body}")
-                    return str(response_body)
+            return self.extract_generated_text(response_body, kwargs.get("assistant_prefill"))
                     
         except ClientError as e:
-            logger.error(f"Bedrock text generation failed: {e}")
+            if e.response.get('Error', {}).get('Code') in THROTTLING_ERROR_CODES:
+                logger.error(f"Bedrock text generation still throttled after {settings.bedrock_max_attempts} attempts: {e}")
+            else:
+                logger.error(f"Bedrock text generation failed: {e}")
             raise
         except Exception as e:
             logger.error(f"Text generation error: {e}")
             raise
     
+    def generate_text_stream(self, prompt: str, system_prompt: str = None, **kwargs) -> Iterator[str]:
+        """Generate text using Bedrock LLM, yielding text as the model produces it
+        
+        Streaming keeps bytes flowing on long generations, so they don't hit the read timeout.
+        """
+        try:
+            request_body = self.build_text_request(prompt, system_prompt, **kwargs)
+            is_claude = "anthropic.claude" in self.model_id.lower()
+            
+            with _generation_slots():
+                response = self.bedrock_runtime.invoke_model_with_response_stream(
+                    modelId=self.model_id,
+                    body=_dumps(request_body)
+                )
+                
+                # Claude continues from the prefilled assistant turn, so emit the prefix first
+                assistant_prefill = kwargs.get("assistant_prefill")
+                if assistant_prefill and is_claude:
+                    yield assistant_prefill
+                
+                for event in response['body']:
+                    chunk = event.get('chunk')
+                    if chunk is None:
+                        # Any other event is a stream error (throttling, model error, ...)
+                        raise RuntimeError(f"Bedrock stream error: {event}")
+                    
+                    payload = _loads(chunk['bytes'])
+                    if is_claude:
+                        text = payload.get('delta', {}).get('text') if payload.get('type') == 'content_block_delta' else None
+                    else:
+                        text = payload.get('outputText')
+                    if text:
+                        yield text
+                    
+        except ClientError as e:
+            logger.error(f"Bedrock streaming text generation failed: {e}")
+            raise
+        except Exception as e:
+            logger.error(f"Streaming text generation error: {e}")
+            raise
+    
+    def build_text_request(self, prompt: str, system_prompt: str = None, **kwargs) -> Dict:
+        """Build the model-specific request body for text generation"""
+        # Default parameters for Claude
+        default_params = {
+            "max_tokens": kwargs.get("max_tokens", 4000),
+            "temperature": kwargs.get("temperature", 0.3),
+            "top_p": kwargs.get("top_p", 0.9),
+            "stop_sequences": kwargs.get("stop_sequences", [])
+        }
+        
+        # Build request body based on model type
+        if "anthropic.claude" in self.model_id.lower():
+            return self._build_claude_request(
+                prompt, system_prompt, default_params, kwargs.get("assistant_prefill")
+            )
+        elif "amazon.titan" in self.model_id.lower():
+            return self._build_titan_request(prompt, default_params)
+        else:
+            # Generic request format
+            return {
+                "inputText": prompt,
+                "textGenerationConfig": default_params
+            }
+    
+    def extract_generated_text(self, response_body: Dict, assistant_prefill: str = None) -> str:
+        """Extract the generated text from a model response body"""
+        # Extract text based on model type
+        if "anthropic.claude" in self.model_id.lower():
+            # Claude continues from the prefilled assistant turn, so restore the prefix
+            return (assistant_prefill or "") + response_body['content'][0]['text']
+        elif "amazon.titan" in self.model_id.lower():
+            return response_body['results'][0]['outputText']
+        else:
+            # Try common response formats
+            if 'outputText' in response_body:
+                return response_body['outputText']
+            elif 'content' in response_body:
+                return response_body['content']
+            elif 'text' in response_body:
+                return response_body['text']
+            else:
+                logger.warning(f"Unknown response format: {response_body}")
+                return str(response_body)
+    
+    @cached_property
+    def bedrock_control(self):
+        """Bedrock control-plane client, used for batch inference jobs"""
+        return get_aws_session().client('bedrock', region_name=get_bedrock_config()["region"])
+    
+    def submit_batch_job(self, job_name: str, input_uri: str, output_uri: str, role_arn: str) -> str:
+        """Submit a batch inference job over a JSONL file of records in S3, returning the job ARN"""
+        try:
+            response = self.bedrock_control.create_model_invocation_job(
+                jobName=job_name,
+                roleArn=role_arn,
+                modelId=self.model_id,
+                inputDataConfig={'s3InputDataConfig': {'s3Uri': input_uri, 's3InputFormat': 'JSONL'}},
+                outputDataConfig={'s3OutputDataConfig': {'s3Uri': output_uri}}
+            )
+            logger.info(f"Submitted Bedrock batch inference job: {job_name}")
+            return response['jobArn']
+            
+        except ClientError as e:
+            logger.error(f"Failed to submit batch inference job {job_name}: {e}")
+            raise
+    
+    def wait_for_batch_job(self, job_arn: str, poll_interval: float = 60.0, timeout: Optional[float] = None) -> str:
+        """Poll a batch inference job until it finishes, returning its final status
+        
+        A job still unfinished after timeout seconds is stopped and reported as BATCH_JOB_TIMED_OUT.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            status = self.bedrock_control.get_model_invocation_job(jobIdentifier=job_arn)['status']
+            if status in BATCH_JOB_FINAL_STATUSES:
+                logger.info(f"Batch inference job finished with status: {status}")
+                return status
+            
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                logger.warning(f"Batch inference job still {status} after {timeout:.0f}s; stopping it")
+                try:
+                    self.bedrock_control.stop_model_invocation_job(jobIdentifier=job_arn)
+                except ClientError as e:
+                    logger.error(f"Failed to stop batch inference job {job_arn}: {e}")
+                return BATCH_JOB_TIMED_OUT
+            
+            logger.debug(f"Batch inference job status: {status}")
+            time.sleep(poll_interval if remaining is None else min(poll_interval, remaining))
+    
     def get_embeddings(self, text: str) -> np.ndarray:
         """Get embeddings using Bedrock embeddings model"""
         try:
@@ -119,11 +266,11 @@ class BedrockClient:
             # Make request to Bedrock
             response = self.bedrock_runtime.invoke_model(
                 modelId=self.embedding_model_id,
-                body=json.dumps(request_body)
+                body=_dumps(request_body)
             )
             
             # Parse response
-            response_body = json.loads(response['body'].read())
+            response_body = _loads(response['body'].read())
             
             # Extract embeddings based on model type
             if "amazon.titan-embed" in self.embedding_model_id.lower():
@@ -153,10 +300,14 @@ class BedrockClient:
             logger.error(f"Request was for model: {self.embedding_model_id}")
             raise
     
-    def _build_claude_request(self, prompt: str, system_prompt: str, params: Dict) -> Dict:
+    def _build_claude_request(self, prompt: str, system_prompt: str, params: Dict, assistant_prefill: str = None) -> Dict:
         """Build request body for Claude models"""
         messages = [{"role": "user", "content": prompt}]
         
+        # Prefilling the assistant turn (e.g. with "{") constrains the response format
+        if assistant_prefill:
+            messages.append({"role": "assistant", "content": assistant_prefill})
+        
         request_body = {
             "anthropic_version": "bedrock-2023-05-31",
             "max_tokens": params["max_tokens"],
@@ -165,7 +316,12 @@ class BedrockClient:
             "messages": messages
         }
         
-        if system_prompt:
+        if system_prompt and settings.bedrock_prompt_caching:
+            # Cache the shared system prompt prefix across requests
+            request_body["system"] = [
+                {"type": "text", "text": system_prompt, "cache_control": {"type": "ephemeral"}}
+            ]
+        elif system_prompt:
             request_body["system"] = system_prompt
             
         if params["stop_sequences"]:
@@ -1,19 +1,32 @@
 """
 DynamoDB client for chat history and agent information management
 """
-import boto3
 import json
 from datetime import datetime, timezone
-from typing import List, Dict, Optional, Any
+from functools import lru_cache
+from typing import List, Dict, Optional, Any, Sequence, Tuple
 from decimal import Decimal
 from botocore.exceptions import ClientError, NoCredentialsError
 from loguru import logger
-from config.settings import get_aws_config, settings
+from config.settings import get_aws_session, settings
+from src.infrastructure.ttl_cache import TTLCache
+
+# Sessions and agent records kept in the in-process read cache
+READ_CACHE_SIZE = 1024
+
+# Cached marker for agent records known not to exist
+_MISSING = object()
 
 
 class DynamoDBChatClient:
     """Client for managing chat history and agent information in DynamoDB"""
     
+    @classmethod
+    @lru_cache(maxsize=1)
+    def instance(cls) -> "DynamoDBChatClient":
+        """Get a shared, lazily constructed instance for the current process"""
+        return cls()
+    
     @staticmethod
     def convert_floats_to_decimal(obj: Any) -> Any:
         """Convert float values to Decimal and datetime to ISO string for DynamoDB compatibility"""
@@ -30,9 +43,14 @@ class DynamoDBChatClient:
     
     def __init__(self):
         try:
-            self.dynamodb = boto3.resource('dynamodb', **get_aws_config())
+            self.dynamodb = get_aws_session().resource('dynamodb')
             self.chat_table = self.dynamodb.Table(settings.dynamodb_chat_history_table)
             self.agent_table = self.dynamodb.Table(settings.dynamodb_agent_info_table)
+            
+            # Session items and agent records are re-read several times per chat turn;
+            # writes made through this client keep the cached copies current
+            self._session_items = TTLCache(maxsize=READ_CACHE_SIZE, ttl=settings.dynamodb_cache_ttl)
+            self._agent_items = TTLCache(maxsize=READ_CACHE_SIZE, ttl=settings.dynamodb_cache_ttl)
             logger.info("DynamoDB client initialized successfully")
         except NoCredentialsError:
             logger.error("AWS credentials not found. Please configure your credentials.")
@@ -41,21 +59,26 @@ class DynamoDBChatClient:
             logger.error(f"Failed to initialize DynamoDB client: {e}")
             raise
     
-    def create_chat_session(self, session_id: str, user_id: str = "default") -> bool:
-        """Create a new chat session"""
+    def create_chat_session(
+        self,
+        session_id: str,
+        user_id: str = "default",
+        initial_messages: Sequence[Tuple[str, str, Optional[Dict]]] = ()
+    ) -> bool:
+        """Create a new chat session, optionally seeded with (role, content, metadata) messages"""
         try:
             timestamp = datetime.now(timezone.utc).isoformat()
             
-            self.chat_table.put_item(
-                Item={
-                    'session_id': session_id,
-                    'user_id': user_id,
-                    'created_at': timestamp,
-                    'updated_at': timestamp,
-                    'messages': [],
-                    'session_status': 'active'
-                }
-            )
+            item = {
+                'session_id': session_id,
+                'user_id': user_id,
+                'created_at': timestamp,
+                'updated_at': timestamp,
+                'messages': self._build_messages(initial_messages, timestamp),
+                'session_status': 'active'
+            }
+            self.chat_table.put_item(Item=item)
+            self._session_items.put(session_id, item)
             logger.info(f"Created chat session: {session_id}")
             return True
             
@@ -63,55 +86,79 @@ class DynamoDBChatClient:
             logger.error(f"Failed to create chat session {session_id}: {e}")
             return False
     
+    def _build_messages(self, messages: Sequence[Tuple[str, str, Optional[Dict]]], timestamp: str) -> List[Dict]:
+        """Build stored message items from (role, content, metadata) tuples"""
+        return [
+            {
+                'role': role,  # 'user', 'assistant', 'system'
+                'content': content,
+                'timestamp': timestamp,
+                # Convert floats to Decimal for DynamoDB compatibility
+                'metadata': self.convert_floats_to_decimal(metadata or {})
+            }
+            for role, content, metadata in messages
+        ]
+    
     def add_message(self, session_id: str, role: str, content: str, metadata: Optional[Dict] = None) -> bool:
         """Add a message to a chat session"""
+        return self.add_messages(session_id, [(role, content, metadata)])
+    
+    def add_messages(self, session_id: str, messages: Sequence[Tuple[str, str, Optional[Dict]]]) -> bool:
+        """Append several (role, content, metadata) messages to a chat session in one write"""
         try:
             timestamp = datetime.now(timezone.utc).isoformat()
             
-            # Convert floats to Decimal for DynamoDB compatibility
-            converted_metadata = self.convert_floats_to_decimal(metadata or {})
-            
-            message = {
-                'role': role,  # 'user', 'assistant', 'system'
-                'content': content,
-                'timestamp': timestamp,
-                'metadata': converted_metadata
-            }
+            new_messages = self._build_messages(messages, timestamp)
             
-            # Add message to the session
+            # Messages live in a list on the session item, so one update appends them all
             self.chat_table.update_item(
                 Key={'session_id': session_id},
                 UpdateExpression='SET messages = list_append(if_not_exists(messages, :empty_list), :message), updated_at = :timestamp',
                 ExpressionAttributeValues={
-                    ':message': [message],
+                    ':message': new_messages,
                     ':timestamp': timestamp,
                     ':empty_list': []
                 }
             )
             
-            logger.info(f"Added {role} message to session {session_id}")
+            cached_item = self._session_items.get(session_id)
+            if cached_item is not None:
+                self._session_items.put(session_id, {
+                    **cached_item,
+                    'messages': cached_item.get('messages', []) + new_messages,
+                    'updated_at': timestamp
+                })
+            
+            logger.info("Added {} message(s) to session {}", len(new_messages), session_id)
             return True
             
         except ClientError as e:
-            logger.error(f"Failed to add message to session {session_id}: {e}")
+            logger.error(f"Failed to add messages to session {session_id}: {e}")
             return False
     
+    def _get_session_item(self, session_id: str) -> Optional[Dict]:
+        """Get the session item, served from the read cache when fresh"""
+        item = self._session_items.get(session_id)
+        if item is None:
+            item = self.chat_table.get_item(Key={'session_id': session_id}).get('Item')
+            if item is not None:
+                self._session_items.put(session_id, item)
+        return item
+    
     def get_chat_history(self, session_id: str, limit: Optional[int] = None) -> Optional[List[Dict]]:
         """Get chat history for a session"""
         try:
-            response = self.chat_table.get_item(Key={'session_id': session_id})
+            item = self._get_session_item(session_id)
             
-            if 'Item' not in response:
+            if item is None:
                 logger.warning(f"Chat session {session_id} not found")
                 return None
             
-            messages = response['Item'].get('messages', [])
-            
-            # Apply limit if specified
-            if limit and len(messages) > limit:
-                messages = messages[-limit:]
+            # Apply limit if specified (always copy, callers may extend the list)
+            messages = item.get('messages', [])
+            messages = messages[-limit:] if limit else list(messages)
             
-            logger.info(f"Retrieved {len(messages)} messages for session {session_id}")
+            logger.info("Retrieved {} messages for session {}", len(messages), session_id)
             return messages
             
         except ClientError as e:
@@ -121,12 +168,11 @@ class DynamoDBChatClient:
     def get_session_info(self, session_id: str) -> Optional[Dict]:
         """Get session information"""
         try:
-            response = self.chat_table.get_item(Key={'session_id': session_id})
+            item = self._get_session_item(session_id)
             
-            if 'Item' not in response:
+            if item is None:
                 return None
             
-            item = response['Item']
             return {
                 'session_id': item['session_id'],
                 'user_id': item.get('user_id', 'default'),
@@ -184,6 +230,12 @@ class DynamoDBChatClient:
                 }
             )
             
+            cached_item = self._session_items.get(session_id)
+            if cached_item is not None:
+                self._session_items.put(
+                    session_id, {**cached_item, 'session_status': status, 'updated_at': timestamp}
+                )
+            
             logger.info(f"Updated session {session_id} status to {status}")
             return True
             
@@ -206,7 +258,8 @@ class DynamoDBChatClient:
             }
             
             self.agent_table.put_item(Item=item)
-            logger.info(f"Stored agent info for: {agent_id}")
+            self._agent_items.put(agent_id, item)
+            logger.info("Stored agent info for: {}", agent_id)
             return True
             
         except ClientError as e:
@@ -216,12 +269,13 @@ class DynamoDBChatClient:
     def get_agent_info(self, agent_id: str) -> Optional[Dict]:
         """Get agent configuration or state information"""
         try:
-            response = self.agent_table.get_item(Key={'agent_id': agent_id})
-            
-            if 'Item' not in response:
-                return None
+            item = self._agent_items.get(agent_id)
+            if item is None:
+                item = self.agent_table.get_item(Key={'agent_id': agent_id}).get('Item')
+                # Misses are cached too, e.g. sessions that have no analysis yet
+                self._agent_items.put(agent_id, _MISSING if item is None else item)
             
-            return response['Item']
+            return None if item is _MISSING else item
             
         except ClientError as e:
             logger.error(f"Failed to get agent info for {agent_id}: {e}")
@@ -1,19 +1,25 @@
 """
 S3 client for managing knowledge base documents
 """
-import boto3
+from functools import lru_cache
 from typing import List, Dict, Optional, Iterator
 from botocore.exceptions import ClientError, NoCredentialsError
 from loguru import logger
-from config.settings import get_aws_config, settings
+from config.settings import get_aws_session, settings
 
 
 class S3KnowledgeBaseClient:
     """Client for managing SEMP knowledge base in S3"""
     
+    @classmethod
+    @lru_cache(maxsize=1)
+    def instance(cls) -> "S3KnowledgeBaseClient":
+        """Get a shared, lazily constructed instance for the current process"""
+        return cls()
+    
     def __init__(self):
         try:
-            self.s3_client = boto3.client('s3', **get_aws_config())
+            self.s3_client = get_aws_session().client('s3')
             self.bucket = settings.s3_knowledge_base_bucket
             self.prefix = settings.s3_knowledge_base_prefix
             logger.info(f"S3 client initialized for bucket: {self.bucket}")
@@ -60,7 +66,10 @@ class S3KnowledgeBaseClient:
             return content
             
         except ClientError as e:
-            logger.error(f"Failed to download document {key}: {e}")
+            if e.response.get('Error', {}).get('Code') == 'NoSuchKey':
+                logger.debug(f"Document not found: {key}")
+            else:
+                logger.error(f"Failed to download document {key}: {e}")
             return None
     
     def download_document_stream(self, key: str) -> Optional[Iterator[bytes]]:
@@ -90,6 +90,7 @@ class AnalysisRequest(BaseModel):
     focus_areas: Optional[List[str]] = Field(None, description="Specific areas to focus on")
     severity_threshold: SeverityLevel = Field(default=SeverityLevel.LOW, description="Minimum severity to report")
     include_suggestions: bool = Field(default=True, description="Include improvement suggestions")
+    use_batch_inference: bool = Field(default=False, description="Submit sections as a Bedrock batch inference job")
     
     # Context
     session_id: Optional[str] = Field(None, description="Associated chat session")
@@ -0,0 +1,62 @@
+"""
+In-memory BM25 keyword index over knowledge base chunks
+"""
+import heapq
+import math
+import re
+from collections import Counter, defaultdict
+from typing import Dict, List, Sequence, Tuple
+
+TOKEN_PATTERN = re.compile(r"\w+")
+
+# Function words ignored in queries, so a question only matches chunks on its content terms
+STOP_WORDS = frozenset("""
+a about an and any are as at be been but by can could do does for from had has have how i if in
+into is it its me my of on or should so than that the their them then there these they this to
+was we were what when where which who why will with would you your
+""".split())
+
+
+def tokenize(text: str) -> List[str]:
+    """Split text into lowercase word tokens"""
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+class BM25Index:
+    """Okapi BM25 scoring over a fixed list of texts, using an inverted index"""
+    
+    def __init__(self, texts: Sequence[str], k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.postings: Dict[str, List[Tuple[int, int]]] = defaultdict(list)
+        self.doc_lengths: List[int] = []
+        
+        for doc_id, text in enumerate(texts):
+            term_counts = Counter(tokenize(text))
+            self.doc_lengths.append(sum(term_counts.values()))
+            for term, count in term_counts.items():
+                self.postings[term].append((doc_id, count))
+        
+        self.avg_doc_length = sum(self.doc_lengths) / len(self.doc_lengths) if self.doc_lengths else 0.0
+    
+    def search(self, query: str, top_k: int = 5, min_score: float = 0.0) -> List[Tuple[int, float]]:
+        """Return (document index, score) pairs for the best matching texts
+        
+        Stop-words in the query are ignored, and texts scoring below min_score are dropped.
+        """
+        n_docs = len(self.doc_lengths)
+        if not n_docs:
+            return []
+        
+        scores: Dict[int, float] = defaultdict(float)
+        for term in set(tokenize(query)) - STOP_WORDS:
+            postings = self.postings.get(term)
+            if not postings:
+                continue
+            idf = math.log(1 + (n_docs - len(postings) + 0.5) / (len(postings) + 0.5))
+            for doc_id, count in postings:
+                norm = self.k1 * (1 - self.b + self.b * self.doc_lengths[doc_id] / self.avg_doc_length)
+                scores[doc_id] += idf * count * (self.k1 + 1) / (count + norm)
+        
+        matches = [(doc_id, score) for doc_id, score in scores.items() if score >= min_score]
+        return heapq.nlargest(top_k, matches, key=lambda item: item[1])
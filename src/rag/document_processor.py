@@ -3,7 +3,8 @@ Document processor for extracting text from various file formats
 """
 import io
 import json
-from typing import List, Dict, Optional, Any, Tuple
+import mmap
+from typing import List, Dict, Optional, Any, Tuple, Union
 import PyPDF2
 import docx
 import markdown
@@ -11,6 +12,15 @@ import re
 from loguru import logger
 from config.settings import settings
 
+# Raw document content: in-memory bytes or a read-only memory map of the file
+DocumentContent = Union[bytes, bytearray, memoryview, mmap.mmap]
+
+# HTML tags left after rendering Markdown (simple removal for basic cases)
+HTML_TAG_PATTERN = re.compile('<.*?>')
+
+# Sentence terminators used to split text into sentences
+SENTENCE_SPLIT_PATTERN = re.compile(r'[.!?]+')
+
 
 class DocumentProcessor:
     """Process documents and extract text content"""
@@ -22,8 +32,12 @@ class DocumentProcessor:
         self.line_endings = []  # Track line break positions
         self.page_breaks = []   # Track page break positions
     
-    def extract_text(self, content: bytes, filename: str, content_type: str = None) -> Optional[str]:
-        """Extract text from document content based on file type"""
+    def extract_text(self, content: DocumentContent, filename: str, content_type: str = None) -> Optional[str]:
+        """Extract text from document content based on file type
+        
+        Content may be any buffer-protocol object (e.g. an mmap of the file) so
+        large documents can be parsed without first copying them into memory.
+        """
         try:
             # Reset coordinate tracking for new document
             self.line_endings = []
@@ -53,16 +67,15 @@ class DocumentProcessor:
     
     def _extract_from_pdf(self, content: bytes) -> str:
         """Extract text from PDF content"""
-        text = ""
         try:
             pdf_reader = PyPDF2.PdfReader(io.BytesIO(content))
-            for page_num, page in enumerate(pdf_reader.pages):
-                page_text = page.extract_text()
-                text += f"\n--- Page {page_num + 1} ---\n{page_text}\n"
+            return "".join(
+                f"\n--- Page {page_num + 1} ---\n{page.extract_text()}\n"
+                for page_num, page in enumerate(pdf_reader.pages)
+            )
         except Exception as e:
             logger.error(f"Error extracting PDF text: {e}")
             raise
-        return text
     
     def _extract_from_docx(self, content: bytes) -> str:
         """Extract text from DOCX content"""
@@ -81,8 +94,7 @@ class DocumentProcessor:
             # Convert markdown to plain text (remove markdown formatting)
             html = markdown.markdown(text)
             # Simple HTML tag removal (for basic cases)
-            import re
-            clean_text = re.sub('<.*?>', '', html)
+            clean_text = HTML_TAG_PATTERN.sub('', html)
             return clean_text
         except Exception as e:
             logger.error(f"Error extracting Markdown text: {e}")
@@ -113,6 +125,19 @@ class DocumentProcessor:
             logger.error(f"Error extracting plain text: {e}")
             raise
     
+    @staticmethod
+    def _open_stream(content: DocumentContent):
+        """Get a seekable binary stream over document content without copying mmaps"""
+        if isinstance(content, mmap.mmap):
+            content.seek(0)
+            return content
+        return io.BytesIO(content)
+    
+    @staticmethod
+    def _decode_text(content: DocumentContent) -> str:
+        """Decode UTF-8 document content from any buffer-protocol object"""
+        return str(content, 'utf-8')
+    
     def _get_content_type_from_filename(self, filename: str) -> str:
         """Determine content type from filename extension"""
         extension = filename.lower().split('.')[-1]
@@ -163,9 +188,8 @@ class DocumentProcessor:
     
     def _split_into_sentences(self, text: str) -> List[str]:
         """Split text into sentences"""
-        import re
         # Simple sentence splitting - can be improved with NLTK or spaCy
-        sentences = re.split(r'[.!?]+', text)
+        sentences = SENTENCE_SPLIT_PATTERN.split(text)
         return [s.strip() for s in sentences if s.strip()]
     
     def _get_overlap_text(self, text: str) -> str:
@@ -222,13 +246,13 @@ class DocumentProcessor:
         elif isinstance(value, (int, float)):
             return str(value)
     
-    def _extract_from_pdf_with_coordinates(self, content: bytes) -> str:
+    def _extract_from_pdf_with_coordinates(self, content: DocumentContent) -> str:
         """Extract text from PDF content with coordinate tracking"""
         text = ""
         char_position = 0
         
         try:
-            pdf_reader = PyPDF2.PdfReader(io.BytesIO(content))
+            pdf_reader = PyPDF2.PdfReader(self._open_stream(content))
             for page_num, page in enumerate(pdf_reader.pages):
                 # Mark page break position
                 if page_num > 0:
@@ -259,10 +283,10 @@ class DocumentProcessor:
         
         return text
     
-    def _extract_from_docx_with_coordinates(self, content: bytes) -> str:
+    def _extract_from_docx_with_coordinates(self, content: DocumentContent) -> str:
         """Extract text from DOCX content with coordinate tracking"""
         try:
-            doc = docx.Document(io.BytesIO(content))
+            doc = docx.Document(self._open_stream(content))
             text = ""
             char_position = 0
             
@@ -281,10 +305,10 @@ class DocumentProcessor:
             logger.error(f"Error extracting DOCX text: {e}")
             raise
     
-    def _extract_from_markdown_with_coordinates(self, content: bytes) -> str:
+    def _extract_from_markdown_with_coordinates(self, content: DocumentContent) -> str:
         """Extract text from Markdown content with coordinate tracking"""
         try:
-            text = content.decode('utf-8')
+            text = self._decode_text(content)
             char_position = 0
             
             # Track line endings in original text
@@ -295,7 +319,7 @@ class DocumentProcessor:
             # Convert markdown to plain text (remove markdown formatting)
             html = markdown.markdown(text)
             # Simple HTML tag removal (for basic cases)
-            clean_text = re.sub('<.*?>', '', html)
+            clean_text = HTML_TAG_PATTERN.sub('', html)
             
             return clean_text
             
@@ -303,10 +327,10 @@ class DocumentProcessor:
             logger.error(f"Error extracting Markdown text: {e}")
             raise
     
-    def _extract_from_json_with_coordinates(self, content: bytes) -> str:
+    def _extract_from_json_with_coordinates(self, content: DocumentContent) -> str:
         """Extract text from JSON content with coordinate tracking"""
         try:
-            text = content.decode('utf-8')
+            text = self._decode_text(content)
             json_data = json.loads(text)
             
             # Convert JSON to readable text format
@@ -328,10 +352,10 @@ class DocumentProcessor:
             logger.error(f"Error extracting JSON text: {e}")
             raise
     
-    def _extract_from_text_with_coordinates(self, content: bytes) -> str:
+    def _extract_from_text_with_coordinates(self, content: DocumentContent) -> str:
         """Extract text from plain text content with coordinate tracking"""
         try:
-            text = content.decode('utf-8')
+            text = self._decode_text(content)
             
             # Track line endings
             for i, char in enumerate(text):
@@ -3,7 +3,10 @@ RAG Knowledge Base processor using vecclean for embeddings and vector search
 """
 import json
 import pickle
-from typing import List, Dict, Optional, Any
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Callable, List, Dict, Optional, Any
 from pathlib import Path
 import numpy as np
 from loguru import logger
@@ -11,23 +14,48 @@ from loguru import logger
 from config.settings import get_bedrock_config, settings
 from src.infrastructure.s3_client import S3KnowledgeBaseClient
 from src.infrastructure.bedrock_client import BedrockClient
+from src.rag.bm25_index import BM25Index
 from src.rag.document_processor import DocumentProcessor
+from src.rag.query_cache import QueryEmbeddingCache
 from src.rag.vector_store import SimpleVectorStore
 
+# Reciprocal rank fusion constant (larger values flatten the rank weighting)
+RRF_K = 60
+
+# Least BM25 score for a keyword hit; matching a single common term scores below this
+BM25_MIN_SCORE = 1.0
+
+# Fused hits scoring below this fraction of the best fused score are dropped, so weak
+# hits ranked by only one search don't pad out a strong result
+FUSED_SCORE_RATIO = 0.5
+
 
 class SEMPKnowledgeBase:
     """Knowledge base for SEMP documents with RAG capabilities"""
     
+    @classmethod
+    @lru_cache(maxsize=1)
+    def instance(cls) -> "SEMPKnowledgeBase":
+        """Get a shared, lazily constructed instance for the current process"""
+        return cls()
+    
     def __init__(self, cache_dir: str = "./cache"):
         self.cache_dir = Path(cache_dir)
         self.cache_dir.mkdir(exist_ok=True)
         
-        # Initialize clients
-        self.s3_client = S3KnowledgeBaseClient()
+        # Initialize clients (shared per process)
+        self.s3_client = S3KnowledgeBaseClient.instance()
         self.doc_processor = DocumentProcessor()
         
         # Initialize Bedrock client
-        self.bedrock_client = BedrockClient()
+        self.bedrock_client = BedrockClient.instance()
+        
+        # Query embeddings are reused across sections, searches and runs (e.g. "requirements debt <section>")
+        self.query_cache = QueryEmbeddingCache(
+            storage_path=str(self.cache_dir / "query_embeddings.sqlite"),
+            model_id=get_bedrock_config()["embedding_model_id"]
+        )
+        self._get_query_embedding = lru_cache(maxsize=4096)(self._embed_query)
         
         # Initialize vector store (Titan v2 embeddings are 1024 dimensions)
         self.vector_store = SimpleVectorStore(
@@ -35,14 +63,24 @@ class SEMPKnowledgeBase:
             storage_path=str(self.cache_dir / "vector_store.faiss")
         )
         
+        # Keyword index over the same chunks, built on first hybrid search
+        self._bm25_index: Optional[BM25Index] = None
+        self._bm25_lock = threading.Lock()
+        self._search_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="kb-search")
+        
         # Document metadata cache
         self.document_cache_path = self.cache_dir / "document_metadata.json"
         self.document_metadata = self._load_document_metadata()
         
         logger.info("SEMP Knowledge Base initialized")
     
-    def initialize_knowledge_base(self, force_refresh: bool = False) -> bool:
-        """Initialize or refresh the knowledge base from S3"""
+    def initialize_knowledge_base(
+        self, force_refresh: bool = False, progress_cb: Optional[Callable[[float], None]] = None
+    ) -> bool:
+        """Initialize or refresh the knowledge base from S3
+        
+        progress_cb, if given, is called with the percentage (0-100) of documents processed.
+        """
         try:
             logger.info("Initializing knowledge base...")
             
@@ -68,16 +106,19 @@ class SEMPKnowledgeBase:
             logger.info(f"Processing {len(documents_to_process)} documents")
             
             # Process documents
-            for doc in documents_to_process:
+            for processed, doc in enumerate(documents_to_process, 1):
                 success = self._process_document(doc)
                 if not success:
                     logger.error(f"Failed to process document: {doc['filename']}")
+                if progress_cb:
+                    progress_cb(100.0 * processed / len(documents_to_process))
             
             # Save document metadata
             self._save_document_metadata()
             
             # Save vector store
             self.vector_store.save()
+            self._bm25_index = None
             
             logger.info("Knowledge base initialization completed")
             return True
@@ -90,7 +131,7 @@ class SEMPKnowledgeBase:
         """Search the knowledge base for relevant information"""
         try:
             # Get query embedding
-            query_embedding = self._get_embedding(query)
+            query_embedding = self._get_query_embedding(query)
             
             # Search vector store
             results = self.vector_store.search(
@@ -100,25 +141,112 @@ class SEMPKnowledgeBase:
             )
             
             # Format results with metadata
-            formatted_results = []
-            for result in results:
-                chunk_data = result.get('metadata', {})
-                formatted_results.append({
-                    'text': result.get('text', ''),
-                    'score': result.get('score', 0.0),
-                    'document': chunk_data.get('document_name', 'unknown'),
-                    'chunk_index': chunk_data.get('chunk_index', 0),
-                    'document_type': chunk_data.get('document_type', 'unknown'),
-                    'metadata': chunk_data
-                })
+            formatted_results = [self._format_search_result(result) for result in results]
             
-            logger.info(f"Found {len(formatted_results)} relevant chunks for query")
+            logger.info("Found {} relevant chunks for query", len(formatted_results))
             return formatted_results
             
         except Exception as e:
             logger.error(f"Failed to search knowledge base: {e}")
             return []
     
+    def search_knowledge_base_batch(
+        self, queries: List[str], top_k: int = 5, score_threshold: float = 0.7
+    ) -> List[List[Dict]]:
+        """Search the knowledge base for several queries with one vector index probe"""
+        try:
+            # Get query embeddings (the embedding model takes one input per request)
+            query_embeddings = np.vstack([self._get_query_embedding(query) for query in queries])
+            
+            # Search vector store once for all queries
+            batch_results = self.vector_store.search_batch(
+                query_embeddings,
+                top_k=top_k,
+                score_threshold=score_threshold
+            )
+            
+            formatted_batches = [
+                [self._format_search_result(result) for result in results]
+                for results in batch_results
+            ]
+            
+            logger.opt(lazy=True).info(
+                "Found {} relevant chunks for {} queries",
+                lambda: sum(len(batch) for batch in formatted_batches), lambda: len(queries)
+            )
+            return formatted_batches
+            
+        except Exception as e:
+            logger.error(f"Failed to batch search knowledge base: {e}")
+            return [[] for _ in queries]
+    
+    def search_bm25(self, query: str, top_k: int = 5, min_score: float = BM25_MIN_SCORE) -> List[Dict]:
+        """Search the knowledge base by keyword (BM25) relevance, ignoring query stop-words"""
+        try:
+            with self._bm25_lock:
+                if self._bm25_index is None:
+                    self._bm25_index = BM25Index(self.vector_store.texts)
+                index = self._bm25_index
+            
+            return [
+                self._format_search_result({
+                    'text': self.vector_store.texts[idx],
+                    'score': score,
+                    'metadata': self.vector_store.metadata[idx]
+                })
+                for idx, score in index.search(query, top_k, min_score)
+            ]
+            
+        except Exception as e:
+            logger.error(f"Failed to keyword search knowledge base: {e}")
+            return []
+    
+    def search_hybrid(self, query: str, top_k: int = 5, score_threshold: float = 0.3) -> List[Dict]:
+        """Search by vector similarity and BM25 concurrently, fusing the rankings with RRF
+        
+        The fused score is scaled so a chunk ranked first by both searches scores 1.0, and
+        hits below FUSED_SCORE_RATIO of the best fused score are dropped. Returns no results
+        when neither search finds a relevant chunk.
+        """
+        candidates = top_k * 2
+        vector_future = self._search_executor.submit(
+            self.search_knowledge_base, query, candidates, score_threshold
+        )
+        keyword_results = self.search_bm25(query, candidates)
+        vector_results = vector_future.result()
+        
+        # Chunks are identified across both result lists by document and position
+        fused: Dict[tuple, Dict] = {}
+        for results in (vector_results, keyword_results):
+            for rank, result in enumerate(results, 1):
+                key = (result['document'], result['chunk_index'])
+                entry = fused.setdefault(key, {**result, 'score': 0.0})
+                entry['score'] += 1.0 / (RRF_K + rank)
+        
+        best_possible = 2.0 / (RRF_K + 1)
+        ranked = sorted(fused.values(), key=lambda result: result['score'], reverse=True)[:top_k]
+        if ranked:
+            cutoff = ranked[0]['score'] * FUSED_SCORE_RATIO
+            ranked = [result for result in ranked if result['score'] >= cutoff]
+        for result in ranked:
+            result['score'] /= best_possible
+        
+        logger.info("Hybrid search fused {} vector and {} keyword hits", len(vector_results), len(keyword_results))
+        return ranked
+    
+    @staticmethod
+    def _format_search_result(result: Dict) -> Dict:
+        """Format a vector store hit with its chunk metadata"""
+        chunk_data = result.get('metadata', {})
+        return {
+            'text': result.get('text', ''),
+            'score': result.get('score', 0.0),
+            'document': chunk_data.get('document_name', 'unknown'),
+            'chunk_index': chunk_data.get('chunk_index', 0),
+            'document_type': chunk_data.get('document_type', 'unknown'),
+            'metadata': chunk_data
+        }
+    
     def get_document_context(self, document_names: List[str] = None) -> List[Dict]:
         """Get context from specific documents or all documents"""
         try:
@@ -234,6 +362,15 @@ class SEMPKnowledgeBase:
             logger.error(f"Failed to process document {doc_info.get('filename', 'unknown')}: {e}")
             return False
     
+    def _embed_query(self, query: str) -> np.ndarray:
+        """Get embedding for a search query, using the persistent query cache"""
+        query = QueryEmbeddingCache.normalize(query)
+        embedding = self.query_cache.get(query)
+        if embedding is None:
+            embedding = self._get_embedding(query)
+            self.query_cache.put(query, embedding)
+        return embedding
+    
     def _get_embedding(self, text: str) -> np.ndarray:
         """Get embedding for text using Bedrock"""
         try:
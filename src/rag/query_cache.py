@@ -0,0 +1,56 @@
+"""
+Persistent cache of knowledge base query embeddings
+"""
+import hashlib
+import sqlite3
+import threading
+from typing import Optional
+import numpy as np
+from loguru import logger
+
+
+class QueryEmbeddingCache:
+    """Keep query embeddings across runs, keyed by embedding model and normalized query"""
+    
+    def __init__(self, storage_path: str, model_id: str):
+        self.model_id = model_id
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(storage_path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS query_embeddings (key TEXT PRIMARY KEY, embedding BLOB NOT NULL)"
+        )
+        self._conn.commit()
+    
+    @staticmethod
+    def normalize(query: str) -> str:
+        """Collapse whitespace so trivially different queries share an entry"""
+        return " ".join(query.split())
+    
+    def _key(self, query: str) -> str:
+        """Key a normalized query by the embedding model that encodes it"""
+        return hashlib.blake2b(f"{self.model_id}||{query}".encode('utf-8'), digest_size=16).hexdigest()
+    
+    def get(self, query: str) -> Optional[np.ndarray]:
+        """Return the cached embedding for a normalized query, if any"""
+        try:
+            with self._lock:
+                row = self._conn.execute(
+                    "SELECT embedding FROM query_embeddings WHERE key = ?", (self._key(query),)
+                ).fetchone()
+        except sqlite3.Error as e:
+            logger.warning(f"Failed to read query embedding cache: {e}")
+            return None
+        
+        return np.frombuffer(row[0], dtype=np.float32) if row else None
+    
+    def put(self, query: str, embedding: np.ndarray) -> None:
+        """Store the embedding for a normalized query"""
+        try:
+            with self._lock:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO query_embeddings (key, embedding) VALUES (?, ?)",
+                    (self._key(query), np.asarray(embedding, dtype=np.float32).tobytes())
+                )
+                self._conn.commit()
+        except sqlite3.Error as e:
+            logger.warning(f"Failed to write query embedding cache: {e}")
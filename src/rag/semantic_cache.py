@@ -0,0 +1,156 @@
+"""
+Semantic cache for chain-of-thought analyses of SEMP sections
+"""
+import hashlib
+import threading
+from functools import lru_cache
+from typing import List, Dict, Optional, Any
+import numpy as np
+from loguru import logger
+
+from src.rag.vector_store import SimpleVectorStore
+
+# Cached analyses kept on disk; past this, the oldest are dropped down to EVICT_TO_FRACTION of it
+MAX_ENTRIES = 2000
+EVICT_TO_FRACTION = 0.8
+
+
+class SemanticAnalysisCache:
+    """Reuse LLM analyses for sections that are identical or near-duplicates of ones already analyzed"""
+    
+    @classmethod
+    @lru_cache(maxsize=None)
+    def instance(cls, storage_path: str, model_id: str = "") -> "SemanticAnalysisCache":
+        """Get the shared cache for a storage path, so analyzers in one process don't overwrite each other's entries"""
+        return cls(storage_path, model_id)
+    
+    def __init__(
+        self, storage_path: str, model_id: str = "", similarity_threshold: float = 0.95,
+        max_entries: int = MAX_ENTRIES
+    ):
+        self.model_id = model_id
+        self.similarity_threshold = similarity_threshold
+        self.max_entries = max_entries
+        # An approximate HNSW index keeps near-duplicate probes fast as analyses accumulate;
+        # it still scores candidates by exact cosine, so the threshold keeps its meaning.
+        # Its dimension is the persisted index's, or else that of the first embedding stored
+        self.vector_store = SimpleVectorStore(dimension=None, storage_path=storage_path, index_type="hnsw")
+        self._lock = threading.Lock()
+        
+        # New entries are only written to disk by flush()
+        self._dirty = False
+        
+        # Exact-match tier keyed on content, rebuilt from the persisted entries
+        self._exact = {}
+        self._index_exact()
+    
+    def _index_exact(self) -> None:
+        """Rebuild the exact-match tier from the vector store's entries"""
+        self._exact = {
+            metadata['content_key']: metadata.get('analysis')
+            for metadata in self.vector_store.metadata
+            if metadata.get('content_key')
+        }
+    
+    @staticmethod
+    def context_hash(context: List[Dict], severity_threshold: str) -> str:
+        """Hash the knowledge base chunks an analysis was grounded on and the severity it was limited to"""
+        keys = sorted(f"{ctx['document']}:{ctx['chunk_index']}" for ctx in context)
+        keys.append(f"severity>={severity_threshold}")
+        return hashlib.sha256("|".join(keys).encode('utf-8')).hexdigest()
+    
+    def content_key(self, section_name: str, content: str, context_hash: str) -> str:
+        """Key an analysis by model, section, grounding context and whitespace/case-normalized content"""
+        normalized_content = " ".join(content.lower().split())
+        key_text = f"{self.model_id}||{section_name}||{context_hash}||{normalized_content}"
+        return hashlib.blake2b(key_text.encode('utf-8'), digest_size=16).hexdigest()
+    
+    def lookup_exact(self, content_key: str) -> Optional[Dict[str, Any]]:
+        """Return a cached analysis for exactly the same content, without needing an embedding"""
+        with self._lock:
+            analysis = self._exact.get(content_key)
+        
+        if analysis:
+            logger.info("Exact cache hit for section analysis")
+        return analysis
+    
+    def lookup(self, embedding: np.ndarray, section_name: str, context_hash: str) -> Optional[Dict[str, Any]]:
+        """Return a cached analysis for a similar section with the same name and context"""
+        with self._lock:
+            if not self._matches_dimension(embedding):
+                return None
+            candidates = self.vector_store.search(
+                embedding, top_k=5, score_threshold=self.similarity_threshold
+            )
+        
+        # Only reuse analyses from the same model for the same section grounded on the same
+        # references, so near-identical wording can't carry a result across different constraints
+        for candidate in candidates:
+            metadata = candidate['metadata']
+            if (
+                metadata.get('section_name') == section_name
+                and metadata.get('context_hash') == context_hash
+                and metadata.get('model_id') == self.model_id
+            ):
+                logger.info("Semantic cache hit for section '{}' (score: {:.3f})", section_name, candidate['score'])
+                return metadata.get('analysis')
+        
+        return None
+    
+    def store(
+        self, embedding: np.ndarray, section_name: str, context_hash: str, analysis: Dict[str, Any],
+        content_key: Optional[str] = None
+    ) -> None:
+        """Add an analysis to the cache; it is persisted by the next flush()
+        
+        Failures are logged rather than raised, so they never cost the caller its analysis.
+        """
+        try:
+            with self._lock:
+                if not self._matches_dimension(embedding):
+                    # Entries embedded by a different model can't be compared with this one
+                    logger.warning(
+                        "Embedding dimension changed ({} -> {}); clearing semantic analysis cache",
+                        self.vector_store.dimension, np.asarray(embedding).size
+                    )
+                    self.vector_store.dimension = None
+                    self.vector_store.clear()
+                    self._exact.clear()
+                
+                self.vector_store.add_vector(
+                    vector=embedding,
+                    text=section_name,
+                    metadata={
+                        'section_name': section_name,
+                        'context_hash': context_hash,
+                        'content_key': content_key,
+                        'model_id': self.model_id,
+                        'analysis': analysis
+                    }
+                )
+                if content_key:
+                    self._exact[content_key] = analysis
+                self._dirty = True
+        except Exception as e:
+            logger.warning(f"Failed to store analysis in semantic cache: {e}")
+    
+    def flush(self) -> None:
+        """Persist entries stored since the last flush, first evicting the oldest past max_entries"""
+        try:
+            with self._lock:
+                if not self._dirty:
+                    return
+                
+                if len(self.vector_store.texts) > self.max_entries:
+                    self.vector_store.keep_latest(int(self.max_entries * EVICT_TO_FRACTION))
+                    self._index_exact()
+                
+                self.vector_store.save()
+                self._dirty = False
+        except Exception as e:
+            logger.warning(f"Failed to persist semantic analysis cache: {e}")
+    
+    def _matches_dimension(self, embedding: np.ndarray) -> bool:
+        """Check an embedding against the index dimension (an empty store accepts any)"""
+        dimension = self.vector_store.dimension
+        return dimension is None or dimension == np.asarray(embedding).size
@@ -14,20 +14,29 @@ from loguru import logger
 class SimpleVectorStore:
     """Simple vector store using FAISS for similarity search"""
     
-    def __init__(self, dimension: int, storage_path: str):
+    def __init__(self, dimension: Optional[int], storage_path: str, index_type: str = "flat"):
         self.dimension = dimension
+        self.index_type = index_type
         self.storage_path = Path(storage_path)
         self.metadata_path = self.storage_path.with_suffix('.json')
         
-        # Initialize FAISS index
-        self.index = faiss.IndexFlatIP(dimension)  # Inner product for cosine similarity
+        # Initialize FAISS index; without a dimension it is created by the persisted
+        # index or the first vector added
+        self.index = self._new_index() if dimension else None
         self.metadata = []  # Store metadata for each vector
         self.texts = []     # Store original texts
         
         # Load existing data if available
         self._load()
         
-        logger.info(f"Vector store initialized with {self.index.ntotal} vectors")
+        logger.info(f"Vector store initialized with {len(self.texts)} vectors")
+    
+    def _new_index(self) -> faiss.Index:
+        """Create an empty FAISS index using inner product for cosine similarity"""
+        if self.index_type == "hnsw":
+            # Approximate graph index: probes stay sublinear as the store grows
+            return faiss.IndexHNSWFlat(self.dimension, 32, faiss.METRIC_INNER_PRODUCT)
+        return faiss.IndexFlatIP(self.dimension)
     
     def add_vector(self, vector: np.ndarray, text: str, metadata: Dict[str, Any] = None) -> int:
         """Add a vector to the store with associated text and metadata"""
@@ -37,6 +46,11 @@ class SimpleVectorStore:
         if norm > 0:
             vector = vector / norm
         
+        if self.index is None:
+            # The first vector fixes the dimension of a store created without one
+            self.dimension = int(vector.size)
+            self.index = self._new_index()
+        
         # Add to FAISS index
         vector_2d = vector.reshape(1, -1)
         self.index.add(vector_2d)
@@ -50,7 +64,7 @@ class SimpleVectorStore:
     
     def search(self, query_vector: np.ndarray, top_k: int = 5, score_threshold: float = 0.0) -> List[Dict[str, Any]]:
         """Search for similar vectors"""
-        if self.index.ntotal == 0:
+        if self.index is None or self.index.ntotal == 0:
             return []
         
         # Normalize query vector
@@ -76,6 +90,50 @@ class SimpleVectorStore:
         
         return results
     
+    def search_batch(
+        self, query_vectors: np.ndarray, top_k: int = 5, score_threshold: float = 0.0
+    ) -> List[List[Dict[str, Any]]]:
+        """Search for similar vectors for several queries with a single index probe"""
+        if self.index is None or self.index.ntotal == 0:
+            return [[] for _ in range(len(query_vectors))]
+        
+        # Normalize query vectors row-wise
+        query_matrix = np.asarray(query_vectors, dtype=np.float32).reshape(len(query_vectors), -1)
+        norms = np.linalg.norm(query_matrix, axis=1, keepdims=True)
+        query_matrix = np.divide(query_matrix, norms, out=query_matrix.copy(), where=norms > 0)
+        
+        # Search FAISS index once for all queries
+        scores, indices = self.index.search(query_matrix, min(top_k, self.index.ntotal))
+        
+        # Format results per query
+        all_results = []
+        for query_scores, query_indices in zip(scores, indices):
+            results = []
+            for score, idx in zip(query_scores, query_indices):
+                if idx >= 0 and score >= score_threshold:  # Valid index and meets threshold
+                    results.append({
+                        'text': self.texts[idx],
+                        'score': float(score),
+                        'metadata': self.metadata[idx],
+                        'index': int(idx)
+                    })
+            all_results.append(results)
+        
+        return all_results
+    
+    def keep_latest(self, count: int) -> None:
+        """Drop all but the count most recently added vectors"""
+        start = len(self.texts) - count
+        if start <= 0:
+            return
+        
+        # Neither index type removes vectors in place, so rebuild from the kept ones
+        vectors = self.index.reconstruct_n(start, count)
+        self.index = self._new_index()
+        self.index.add(vectors)
+        self.texts = self.texts[start:]
+        self.metadata = self.metadata[start:]
+    
     def get_all_vectors(self) -> List[Dict[str, Any]]:
         """Get all vectors with their metadata"""
         results = []
@@ -88,13 +146,20 @@ class SimpleVectorStore:
         return results
     
     def save(self) -> None:
-        """Save the vector store to disk"""
+        """Save the vector store to disk
+        
+        Both files are written to temporary paths and moved into place, so a failed
+        write never leaves a truncated index or metadata file behind.
+        """
         try:
             # Create directory if it doesn't exist
             self.storage_path.parent.mkdir(parents=True, exist_ok=True)
+            index_tmp = self.storage_path.with_name(f"{self.storage_path.name}.tmp")
+            metadata_tmp = self.metadata_path.with_name(f"{self.metadata_path.name}.tmp")
             
-            # Save FAISS index
-            faiss.write_index(self.index, str(self.storage_path))
+            # Save FAISS index (a store created without a dimension has none until a vector is added)
+            if self.index is not None:
+                faiss.write_index(self.index, str(index_tmp))
             
             # Save metadata and texts
             data = {
@@ -103,8 +168,12 @@ class SimpleVectorStore:
                 'dimension': self.dimension
             }
             
-            with open(self.metadata_path, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
+            with open(metadata_tmp, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False, separators=(',', ':'))
+            
+            if self.index is not None:
+                os.replace(index_tmp, self.storage_path)
+            os.replace(metadata_tmp, self.metadata_path)
             
             logger.info(f"Vector store saved to {self.storage_path}")
             
@@ -118,6 +187,7 @@ class SimpleVectorStore:
             # Load FAISS index if it exists
             if self.storage_path.exists():
                 self.index = faiss.read_index(str(self.storage_path))
+                self.dimension = self.dimension or self.index.d
                 logger.info(f"Loaded FAISS index with {self.index.ntotal} vectors")
             
             # Load metadata and texts if they exist
@@ -135,16 +205,22 @@ class SimpleVectorStore:
                 
                 logger.info(f"Loaded {len(self.texts)} text entries")
             
+            # An interrupted save can leave the two files from different versions
+            if self.index is not None and self.index.ntotal != len(self.texts):
+                raise ValueError(
+                    f"index has {self.index.ntotal} vectors but metadata has {len(self.texts)} entries"
+                )
+            
         except Exception as e:
             logger.warning(f"Could not load existing vector store: {e}")
             # Initialize fresh if loading fails
-            self.index = faiss.IndexFlatIP(self.dimension)
+            self.index = self._new_index() if self.dimension else None
             self.metadata = []
             self.texts = []
     
     def clear(self) -> None:
         """Clear all vectors from the store"""
-        self.index = faiss.IndexFlatIP(self.dimension)
+        self.index = self._new_index() if self.dimension else None
         self.metadata = []
         self.texts = []
         logger.info("Vector store cleared")
@@ -152,7 +228,7 @@ class SimpleVectorStore:
     def get_stats(self) -> Dict[str, Any]:
         """Get statistics about the vector store"""
         return {
-            'total_vectors': self.index.ntotal,
+            'total_vectors': self.index.ntotal if self.index is not None else 0,
             'dimension': self.dimension,
             'storage_size_bytes': self.storage_path.stat().st_size if self.storage_path.exists() else 0,
             'metadata_entries': len(self.metadata),
@@ -14,9 +14,6 @@ from flask_cors import CORS
 from werkzeug.utils import secure_filename
 from loguru import logger
 
-# Add src to path for imports
-sys.path.append(str(Path(__file__).parent / "src"))
-
 from config.settings import settings
 from src.agent.session_manager import SEMPChatSessionManager
 from src.agent.debt_analyzer import RequirementsDebtAnalyzer
@@ -44,7 +41,7 @@ def initialize_components():
     """Initialize global components"""
     global knowledge_base, session_manager, document_processor
     try:
-        knowledge_base = SEMPKnowledgeBase()
+        knowledge_base = SEMPKnowledgeBase.instance()
         session_manager = SEMPChatSessionManager()
         document_processor = DocumentProcessor()
         logger.info("Components initialized successfully")
@@ -130,9 +127,14 @@ def analyze_document(upload_id):
         with open(file_path, 'rb') as f:
             binary_content = f.read()
         
-        text_content = document_processor.extract_text(binary_content, filename)
+        # Each upload gets its own processor, since it keeps the line and page positions
+        # of the text it extracted for locating issues
+        upload_processor = DocumentProcessor()
+        text_content = upload_processor.extract_text(binary_content, filename)
         if not text_content:
             return jsonify({'error': 'Failed to extract text from document'}), 400
+        if len(text_content) > settings.max_document_chars:
+            return jsonify({'error': f'Document text exceeds {settings.max_document_chars} characters'}), 413
         
         # Create analysis request
         analysis_request = AnalysisRequest(
@@ -142,12 +144,14 @@ def analyze_document(upload_id):
             include_suggestions=include_suggestions
         )
         
-        # Perform analysis with document processor
-        analyzer = RequirementsDebtAnalyzer(knowledge_base, document_processor)
+        # Perform analysis with the processor that extracted the text; the knowledge base,
+        # Bedrock client and analysis cache are still shared process-wide
+        analyzer = RequirementsDebtAnalyzer(knowledge_base, upload_processor)
         result = analyzer.analyze_document(analysis_request)
         
-        # Convert result to dict for JSON serialization
-        result_dict = result.dict()
+        # Convert result to JSON-ready data once; the session cookie, the response and
+        # the chat session's stored analysis all reuse it
+        result_dict = result.model_dump(mode="json")
         
         # Store analysis result in session for later retrieval
         session[f"{upload_id}_analysis"] = result_dict
@@ -221,18 +225,12 @@ def chat_endpoint():
             if not chat_session_id:
                 return jsonify({'error': 'Failed to create chat session'}), 500
         
-        # Store analysis context in DynamoDB for session manager access (but don't inject it into message)
-        if analysis_id and analysis_id in session:
-            analysis_result = session[analysis_id]
-            # Store the analysis in DynamoDB so session manager can access it
-            session_manager.db_client.store_agent_info(
-                f"session_analysis_{chat_session_id}",
-                {
-                    "current_document": analysis_result.get('document_name', 'unknown'),
-                    "last_analysis": analysis_result,
-                    "analysis_timestamp": analysis_result.get('analysis_timestamp', '')
-                }
-            )
+        # Store analysis context in DynamoDB for session manager access (but don't inject it into message),
+        # once per chat session and analysis rather than on every message
+        attached_key = f"{chat_session_id}_attached_analysis"
+        if analysis_id and analysis_id in session and session.get(attached_key) != analysis_id:
+            if session_manager.store_analysis(chat_session_id, session[analysis_id]):
+                session[attached_key] = analysis_id
         
         # Let the session manager handle context intelligently
         # Don't inject analysis context here - it will be added by session_manager if needed